@@ -1,3 +1,17 @@
 from django.contrib import admin
+from django.template.response import TemplateResponse
+
+from . import slowqueries
 
 # Register your models here.
+
+
+def slow_queries(request):
+    """Admin page listing the slow query log, the newest record first."""
+    context = dict(
+        admin.site.each_context(request),
+        title='Slow queries',
+        records=slowqueries.get_records(),
+        threshold=slowqueries.get_threshold(),
+    )
+    return TemplateResponse(request, 'admin/slow_queries.html', context)
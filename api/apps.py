@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
 
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        # Close kept alive database connections that stopped answering,
+        # before a request gets to use them.
+        from . import db
+        request_started.connect(
+            db.check_database_connections,
+            dispatch_uid='api.db.check_database_connections'
+        )
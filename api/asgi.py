@@ -0,0 +1,180 @@
+"""ASGI adapter serving the Django application from a pool of threads.
+
+Django 2.1 has neither an ASGI handler nor async views, so the adapter
+keeps everything that touches the ORM synchronous: each request runs the
+regular WSGI handler, middleware and views in one of ``ASGI_THREADS``
+threads from start to finish, so its database connection never changes
+thread. The event loop only accepts connections, reads request bodies and
+writes responses, which means a slow client no longer pins a worker.
+"""
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+
+# Response chunks waiting to be written to a slow client, per request.
+QUEUE_SIZE = 16
+
+
+class ResponseCancelled(Exception):
+    """Raised in a request thread once its client is gone."""
+
+
+class ASGIHandler(object):
+    """ASGI 3 application wrapping a WSGI application."""
+
+    def __init__(self, wsgi_application, threads=None):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads or getattr(settings, 'ASGI_THREADS', 8)
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        else:
+            raise ValueError('Unsupported scope type {}.'.format(
+                scope['type']
+            ))
+
+    async def lifespan(self, receive, send):
+        """Acknowledge the startup and shutdown of the server."""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def http(self, scope, receive, send):
+        """Answer one HTTP request."""
+        body = await self.read_body(receive)
+        if body is None:
+            return
+
+        loop = asyncio.get_event_loop()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        cancelled = threading.Event()
+        future = loop.run_in_executor(
+            self.executor,
+            self.run,
+            self.get_environ(scope, body),
+            loop,
+            queue,
+            cancelled
+        )
+
+        try:
+            while True:
+                message = await queue.get()
+                if message is None:
+                    break
+                await send(message)
+        except BaseException:
+            cancelled.set()
+            while await queue.get() is not None:
+                pass
+            raise
+        finally:
+            await future
+
+    async def read_body(self, receive):
+        """Return the request body, or None when the client disconnected."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    def get_environ(self, scope, body):
+        """Build the WSGI environ of an ASGI request."""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': 'HTTP/{}'.format(
+                scope.get('http_version', '1.1')
+            ),
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', ()):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = 'HTTP_' + name
+            if name in environ:
+                value = environ[name] + ',' + value
+            environ[name] = value
+        return environ
+
+    def run(self, environ, loop, queue, cancelled):
+        """Run the WSGI application and queue its response messages.
+
+        Runs in a thread. The response is iterated and closed in the same
+        thread as the view, so request_finished closes the connections the
+        request actually used.
+        """
+        def put(message):
+            if cancelled.is_set():
+                raise ResponseCancelled()
+            asyncio.run_coroutine_threadsafe(
+                queue.put(message),
+                loop
+            ).result()
+
+        def start_response(status, headers, exc_info=None):
+            put({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [
+                    (name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in headers
+                ],
+            })
+            return lambda data: put({
+                'type': 'http.response.body',
+                'body': data,
+                'more_body': True,
+            })
+
+        try:
+            response = self.wsgi_application(environ, start_response)
+            try:
+                for chunk in response:
+                    if chunk:
+                        put({
+                            'type': 'http.response.body',
+                            'body': chunk,
+                            'more_body': True,
+                        })
+                put({'type': 'http.response.body', 'body': b''})
+            finally:
+                if hasattr(response, 'close'):
+                    response.close()
+        except ResponseCancelled:
+            pass
+        finally:
+            asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
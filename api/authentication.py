@@ -0,0 +1,262 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BasicAuthentication,
+    TokenAuthentication,
+)
+
+
+class TTLCache(object):
+    """Bounded, thread safe LRU mapping whose entries expire after a TTL."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the live value stored under key, or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Drop the entry stored under key, if any."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+TOKEN_CACHE_SIZE = getattr(settings, 'TOKEN_CACHE_SIZE', 1024)
+TOKEN_CACHE_TTL = getattr(settings, 'TOKEN_CACHE_TTL', 60)
+
+# Tokens resolved by this process, keyed by the token and its generation
+# in the shared cache, so revoking a token reaches every worker.
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+token_stats = {
+    'shared_hits': 0,
+    'misses': 0,
+}
+
+
+CREDENTIAL_CACHE_SIZE = getattr(settings, 'CREDENTIAL_CACHE_SIZE', 1024)
+CREDENTIAL_CACHE_TTL = getattr(settings, 'CREDENTIAL_CACHE_TTL', 60)
+
+# Basic auth credentials this process has already run through the password
+# hasher, keyed by an HMAC of the username and password.
+credential_cache = TTLCache(CREDENTIAL_CACHE_SIZE, CREDENTIAL_CACHE_TTL)
+credential_stats = {
+    'shared_hits': 0,
+    'misses': 0,
+}
+
+
+GENERATION_CACHE_TTL = getattr(settings, 'AUTH_GENERATION_CACHE_TTL', 5)
+
+# Token and credential generations read by this process, so that a request
+# served from the local tiers does not read the shared cache either. A
+# revocation reaches the other workers once their copy of the generation
+# expires, after GENERATION_CACHE_TTL seconds at most.
+generation_cache = TTLCache(
+    TOKEN_CACHE_SIZE + CREDENTIAL_CACHE_SIZE,
+    GENERATION_CACHE_TTL
+)
+
+
+def _get_generation(generation_key):
+    """Return the generation stored under a key, creating one if needed."""
+    generation = generation_cache.get(generation_key)
+    if generation is None:
+        generation = cache.get(generation_key)
+        if generation is None:
+            cache.add(generation_key, uuid.uuid4().hex, None)
+            generation = cache.get(generation_key)
+        generation_cache.set(generation_key, generation)
+    return generation
+
+
+def _bump_generation(generation_key):
+    """Give a key a new generation, here and in the shared cache."""
+    generation = uuid.uuid4().hex
+    cache.set(generation_key, generation, None)
+    generation_cache.set(generation_key, generation)
+
+
+def _token_generation_key(key):
+    """Return the shared cache key holding the generation of a token."""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return 'auth:token:generation:{}'.format(digest)
+
+
+def _token_cache_key(key):
+    """Return the cache key of a token without exposing the token.
+
+    The key embeds the current generation of the token, so bumping the
+    generation invalidates the token in every process.
+    """
+    generation = _get_generation(_token_generation_key(key))
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return 'auth:token:{}:{}'.format(generation, digest)
+
+
+def invalidate_token(key):
+    """Forget a token in every process."""
+    _bump_generation(_token_generation_key(key))
+
+
+def get_token_stats():
+    """Return the hit and miss counters of the token cache."""
+    return {
+        'local_hits': token_cache.hits,
+        'shared_hits': token_stats['shared_hits'],
+        'misses': token_stats['misses'],
+        'size': len(token_cache),
+    }
+
+
+def _credential_generation_key(username):
+    """Return the shared cache key holding the generation of a username."""
+    digest = hashlib.sha256(username.encode()).hexdigest()
+    return 'auth:basic:generation:{}'.format(digest)
+
+
+def _credential_cache_key(username, password):
+    """Return the cache key of a username and password pair.
+
+    The key embeds the current generation of the username, so bumping the
+    generation invalidates every verification cached for that user.
+    """
+    generation = _get_generation(_credential_generation_key(username))
+    digest = salted_hmac(
+        'api.authentication.CachedBasicAuthentication',
+        '{}\0{}'.format(username, password)
+    ).hexdigest()
+    return 'auth:basic:{}:{}'.format(generation, digest)
+
+
+def invalidate_credentials(username):
+    """Forget every verified password of a username in all processes."""
+    _bump_generation(_credential_generation_key(username))
+
+
+def get_credential_stats():
+    """Return the hit and miss counters of the credential cache."""
+    return {
+        'local_hits': credential_cache.hits,
+        'shared_hits': credential_stats['shared_hits'],
+        'misses': credential_stats['misses'],
+        'size': len(credential_cache),
+    }
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """Basic authentication that remembers successful verifications.
+
+    Repeated requests with the same credentials skip the password hasher
+    until the entry expires or the user is saved again. The shared cache
+    only keeps the primary key of the user, never the password hash, so
+    a hit there costs one primary key lookup.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        cache_key = _credential_cache_key(userid, password)
+        user = credential_cache.get(cache_key)
+        if user is None:
+            user = self.get_user(cache.get(cache_key))
+            if user is not None:
+                credential_stats['shared_hits'] += 1
+            else:
+                credential_stats['misses'] += 1
+                user = super().authenticate_credentials(
+                    userid,
+                    password,
+                    request
+                )[0]
+                cache.set(cache_key, user.pk, CREDENTIAL_CACHE_TTL)
+            credential_cache.set(cache_key, user)
+
+        return (user, None)
+
+    def get_user(self, pk):
+        """Return the active user with the given primary key, or None."""
+        if pk is None:
+            return None
+        try:
+            return get_user_model()._default_manager.get(
+                pk=pk,
+                is_active=True
+            )
+        except ObjectDoesNotExist:
+            return None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token to user resolution.
+
+    Tokens are looked up in a per process LRU first, then in the shared
+    cache and only then in the database. The generation of a token is
+    cached per process too, so a local hit does not touch the shared
+    cache.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = _token_cache_key(key)
+        token = token_cache.get(cache_key)
+        if token is None:
+            token = cache.get(cache_key)
+            if token is not None:
+                token_stats['shared_hits'] += 1
+            else:
+                token_stats['misses'] += 1
+                model = self.get_model()
+                try:
+                    token = model.objects.select_related('user').get(key=key)
+                except model.DoesNotExist:
+                    raise exceptions.AuthenticationFailed(_('Invalid token.'))
+                cache.set(cache_key, token, TOKEN_CACHE_TTL)
+            token_cache.set(cache_key, token)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return (token.user, token)
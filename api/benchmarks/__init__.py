@@ -0,0 +1,98 @@
+"""Benchmark suites for the api.
+
+Run a suite with ``python manage.py benchmark <suite>``. Every suite runs
+against a throwaway test database and a scratch cache, so it never touches
+real data.
+"""
+import time
+from contextlib import contextmanager
+
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from ..runner import scratch_storage
+
+SUITES = {}
+
+
+def register(name):
+    """Register a benchmark suite under the given name."""
+    def decorator(func):
+        SUITES[name] = func
+        return func
+    return decorator
+
+
+@contextmanager
+def test_database():
+    """Run the enclosed block against a throwaway test database."""
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        with scratch_storage():
+            yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of a list of values."""
+    values = sorted(values)
+    index = int(round(percent / 100.0 * (len(values) - 1)))
+    return values[index]
+
+
+def flatten(results, prefix=''):
+    """Flatten nested results into a mapping of metric paths to numbers."""
+    metrics = {}
+    for key, value in results.items():
+        path = prefix + str(key)
+        if isinstance(value, dict):
+            metrics.update(flatten(value, path + '.'))
+        else:
+            metrics[path] = value
+    return metrics
+
+
+def compare(baseline, results, threshold):
+    """Return the metrics of results that regressed against the baseline.
+
+    Metrics ending in ``per_second`` regress when they drop, every other
+    metric regresses when it grows, by more than threshold (a fraction).
+    """
+    baseline, results = flatten(baseline), flatten(results)
+    regressions = []
+    for path, old in sorted(baseline.items()):
+        new = results.get(path)
+        if new is None or not old:
+            continue
+        change = (new - old) / float(old)
+        if path.endswith('per_second'):
+            change = -change
+        if change > threshold:
+            regressions.append((path, old, new))
+    return regressions
+
+
+def requests_per_second(func, requests):
+    """Call func the given number of times and return the calls per second."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        func()
+    return requests / (time.perf_counter() - start)
+
+
+from . import asgi  # noqa: E402,F401
+from . import auth  # noqa: E402,F401
+from . import bulk  # noqa: E402,F401
+from . import connections  # noqa: E402,F401
+from . import fields  # noqa: E402,F401
+from . import middleware  # noqa: E402,F401
+from . import profiling  # noqa: E402,F401
+from . import routes  # noqa: E402,F401
+from . import serializers  # noqa: E402,F401
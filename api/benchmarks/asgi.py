@@ -0,0 +1,92 @@
+import asyncio
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from . import register
+from .. import factories
+from ..asgi import ASGIHandler
+
+# Seconds a slow client takes to send its request.
+CLIENT_DELAY = 0.05
+
+
+@register('asgi')
+def run(requests=200, **options):
+    """Compare slow clients on /skills/ under ASGI and a sync worker.
+
+    Every client takes CLIENT_DELAY seconds to send its request. Under
+    ASGI all of them are connected at once; a sync worker reads and
+    answers them one after the other. Memory per connection is the peak
+    allocated while every ASGI connection is open, divided by their count.
+    """
+    owner = User.objects.create(username='benchmark')
+    factories.seed(owner, 10)
+    token = Token.objects.get(user=owner)
+
+    handler = ASGIHandler(WSGIHandler())
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': reverse('ListCreateSkill'),
+        'query_string': b'',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'accept', b'application/json'),
+            (b'authorization', 'Token {}'.format(token.key).encode()),
+        ],
+    }
+
+    async def client():
+        async def receive():
+            await asyncio.sleep(CLIENT_DELAY)
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            pass
+
+        await handler(scope, receive, send)
+
+    async def clients():
+        await asyncio.gather(*[client() for _ in range(requests)])
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(client())
+        start = time.perf_counter()
+        loop.run_until_complete(clients())
+        asgi = requests / (time.perf_counter() - start)
+
+        # Tracing slows every allocation down, so memory gets its own run.
+        tracemalloc.start()
+        loop.run_until_complete(clients())
+        allocated = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        loop.close()
+
+    wsgi = WSGIHandler()
+    start = time.perf_counter()
+    for _ in range(requests):
+        time.sleep(CLIENT_DELAY)
+        response = wsgi(
+            handler.get_environ(scope, b''),
+            lambda status, headers, exc_info=None: None
+        )
+        b''.join(response)
+        response.close()
+    sync = requests / (time.perf_counter() - start)
+
+    return {
+        'asgi': {
+            'requests_per_second': asgi,
+            'bytes_per_connection': allocated // requests,
+        },
+        'sync': {
+            'requests_per_second': sync,
+        },
+    }
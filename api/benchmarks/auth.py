@@ -0,0 +1,54 @@
+import base64
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import authentication as drf_authentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import register, requests_per_second
+from .. import authentication
+from .. import views
+
+
+@register('auth')
+def run(requests=200, **options):
+    """Compare requests per second on /skills/ for each auth scheme."""
+    user = User.objects.create(username='benchmark')
+    user.set_password('benchmark-password')
+    user.save()
+    token = Token.objects.get(user=user)
+
+    basic = 'Basic ' + base64.b64encode(
+        b'benchmark:benchmark-password'
+    ).decode()
+    schemes = (
+        ('basic', drf_authentication.BasicAuthentication, basic),
+        ('cached-basic', authentication.CachedBasicAuthentication, basic),
+        ('token', drf_authentication.TokenAuthentication,
+            'Token ' + token.key),
+        ('cached-token', authentication.CachedTokenAuthentication,
+            'Token ' + token.key),
+    )
+
+    view = views.ListCreateSkillView
+    original = view.authentication_classes
+    url = reverse('ListCreateSkill')
+    results = {}
+    try:
+        for name, authentication_class, header in schemes:
+            authentication.invalidate_token(token.key)
+            authentication.invalidate_credentials(user.username)
+            authentication.credential_cache.clear()
+            view.authentication_classes = (authentication_class,)
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=header)
+            results[name] = {
+                'requests_per_second': requests_per_second(
+                    lambda: client.get(url, format='json'),
+                    requests
+                ),
+            }
+    finally:
+        view.authentication_classes = original
+    return results
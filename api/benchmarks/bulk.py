@@ -0,0 +1,47 @@
+import time
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import register
+
+
+def experience(prefix, i):
+    """Return the post data of an experience."""
+    return {
+        'order': i,
+        'job_title': '{}-{}'.format(prefix, i),
+        'company': 'Company',
+        'start_date': '2018',
+        'end_date': '2019',
+        'place': 'Bogota',
+        'summary': 'Summary',
+    }
+
+
+@register('bulk')
+def run(requests=200, **options):
+    """Compare rows per second of one-row posts and one array post."""
+    owner = User.objects.create(username='benchmark')
+    client = APIClient()
+    client.force_authenticate(user=owner)
+    url = reverse('ListCreateExperience')
+
+    start = time.perf_counter()
+    for i in range(requests):
+        client.post(url, experience('single', i), format='json')
+    single = requests / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    client.post(
+        url,
+        [experience('bulk', i) for i in range(requests)],
+        format='json'
+    )
+    bulk = requests / (time.perf_counter() - start)
+
+    return {
+        'single': {'rows_per_second': single},
+        'bulk': {'rows_per_second': bulk},
+    }
@@ -0,0 +1,65 @@
+from importlib import import_module
+
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import register, requests_per_second
+from .. import factories
+
+
+def _wrapper(engine, settings_dict, **overrides):
+    """Return a new database wrapper of the given engine."""
+    return import_module(engine + '.base').DatabaseWrapper(
+        dict(settings_dict, ENGINE=engine, **overrides),
+        DEFAULT_DB_ALIAS
+    )
+
+
+@register('connections')
+def run(requests=200, **options):
+    """Compare connect-per-request, persistent and pooled connections.
+
+    Needs PostgreSQL. The test client keeps connections open across
+    requests, so the end of a request is replayed after each one.
+    """
+    original = connections[DEFAULT_DB_ALIAS]
+    if original.vendor != 'postgresql':
+        raise CommandError('The connections benchmark needs PostgreSQL.')
+
+    owner = User.objects.create(username='benchmark')
+    factories.seed(owner, 100)
+    client = APIClient()
+    client.force_authenticate(user=owner)
+
+    settings_dict = original.settings_dict
+    modes = (
+        ('connect-per-request', 'django.db.backends.postgresql', 0),
+        ('persistent', 'django.db.backends.postgresql', 60),
+        ('pooled', 'api.db.pooled', 0),
+    )
+    results = {}
+    try:
+        for name, engine, max_age in modes:
+            connections[DEFAULT_DB_ALIAS] = _wrapper(
+                engine,
+                settings_dict,
+                CONN_MAX_AGE=max_age
+            )
+            results[name] = {}
+            for route in ('ListCreateSkill', 'ListCreateMenu'):
+                url = reverse(route)
+
+                def get():
+                    client.get(url, format='json')
+                    close_old_connections()
+
+                results[name][route] = {
+                    'requests_per_second': requests_per_second(get, requests),
+                }
+            connections[DEFAULT_DB_ALIAS].close()
+    finally:
+        connections[DEFAULT_DB_ALIAS] = original
+    return results
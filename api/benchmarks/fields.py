@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .. import factories
+from . import register, requests_per_second
+
+# The list widgets of the site only need these fields.
+CASES = {
+    'skills': ('ListCreateSkill', {'fields': 'id,name,logo'}),
+    'courses': ('ListCreateCourse', {'exclude': 'main_focus'}),
+}
+
+
+@register('fields')
+def run(requests=200, sizes=(10, 1000, 100000), **options):
+    """Compare payload bytes and requests per second with ?fields=.
+
+    Every route is requested in full and with the projection of its list
+    widget, at growing table sizes.
+    """
+    owner = User.objects.create(username='benchmark')
+    client = APIClient()
+    client.force_authenticate(user=owner)
+
+    results = {}
+    seeded = 0
+    for size in sorted(sizes):
+        factories.seed(owner, size - seeded, prefix='size-{}'.format(size))
+        seeded = size
+        results[str(size)] = {}
+        for case, (name, params) in sorted(CASES.items()):
+            url = reverse(name)
+            for variant, data in (('full', {}), ('sparse', params)):
+                response = client.get(url, data, format='json')
+                results[str(size)]['{}.{}'.format(case, variant)] = {
+                    'bytes': len(response.content),
+                    'requests_per_second': requests_per_second(
+                        lambda: client.get(url, data, format='json'),
+                        requests
+                    ),
+                }
+    return results
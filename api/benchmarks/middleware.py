@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import register, requests_per_second
+
+# The stack every route ran before it was scoped by path.
+FULL_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReplicaStickinessMiddleware',
+]
+
+
+@register('middleware')
+def run(requests=200, **options):
+    """Compare requests per second with the full and the lean stack.
+
+    GET /get-token/ is answered with a 405 straight away, so the middleware
+    dominates the cost of each request.
+    """
+    user = User.objects.create(username='benchmark')
+    header = 'Token ' + Token.objects.get(user=user).key
+    url = '/get-token/'
+
+    results = {}
+    for name, middleware in (('full', FULL_MIDDLEWARE), ('lean', None)):
+        overrides = {'MIDDLEWARE': middleware} if middleware else {}
+        with override_settings(**overrides):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=header)
+            client.get(url, format='json')
+            results[name] = {
+                'requests_per_second': requests_per_second(
+                    lambda: client.get(url, format='json'),
+                    requests
+                ),
+            }
+    return results
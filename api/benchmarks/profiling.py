@@ -0,0 +1,40 @@
+import logging
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .. import factories
+from . import register, requests_per_second
+
+
+@register('profiling')
+def run(requests=200, **options):
+    """Compare requests per second of /skills/ profiled and not profiled.
+
+    The unprofiled case measures the cost of the profiling hooks when
+    sampling is off.
+    """
+    owner = User.objects.create(username='benchmark')
+    factories.seed(owner, 10)
+    client = APIClient()
+    client.force_authenticate(user=owner)
+    url = reverse('ListCreateSkill')
+
+    results = {}
+    logger = logging.getLogger('api.profiling')
+    disabled, logger.disabled = logger.disabled, True
+    try:
+        for name, rate in (('off', 0.0), ('sampled', 1.0)):
+            with override_settings(PROFILING_SAMPLE_RATE=rate):
+                client.get(url, format='json')
+                results[name] = {
+                    'requests_per_second': requests_per_second(
+                        lambda: client.get(url, format='json'),
+                        requests
+                    ),
+                }
+    finally:
+        logger.disabled = disabled
+    return results
@@ -0,0 +1,97 @@
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.generics import GenericAPIView
+from rest_framework.test import APIClient
+
+from . import percentile, register
+from .. import factories
+from .. import models
+from .. import urls
+
+# Models whose url column the search routes filter on.
+SEARCH_MODELS = {
+    'SearchSkills': models.SkillCategory,
+    'SearchPrograms': models.ProgramCategory,
+}
+
+
+def named_routes():
+    """Return the name and view class of every named api GET route."""
+    routes = {}
+    for pattern in urls.urlpatterns:
+        view_class = getattr(getattr(pattern, 'callback', None), 'cls', None)
+        if (view_class is not None and hasattr(view_class, 'get') and
+                issubclass(view_class, GenericAPIView)):
+            routes[pattern.name] = view_class
+    return sorted(routes.items())
+
+
+def route_kwargs(name, view_class):
+    """Return url kwargs pointing at an existing row for the route."""
+    if name in SEARCH_MODELS:
+        return {'url': SEARCH_MODELS[name].objects.values_list(
+            'url',
+            flat=True
+        ).first()}
+    if name.endswith('Details'):
+        return {'pk': view_class.queryset.model.objects.values_list(
+            'pk',
+            flat=True
+        ).first()}
+    return {}
+
+
+def measure(client, url, requests):
+    """Return the query count, latency and allocations of GET url."""
+    client.get(url, format='json')
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url, format='json')
+    # captured_queries slices the live query log, which the next request
+    # resets, so count them before moving on.
+    query_count = len(queries)
+
+    tracemalloc.start()
+    client.get(url, format='json')
+    allocated = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.get(url, format='json')
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'queries': query_count,
+        'p50_ms': percentile(timings, 50),
+        'p99_ms': percentile(timings, 99),
+        'allocated_bytes': allocated,
+    }
+
+
+@register('routes')
+def run(requests=200, sizes=(10, 1000, 100000), **options):
+    """Measure every named route in api/urls.py at growing table sizes."""
+    owner = User.objects.create(username='benchmark')
+    client = APIClient()
+    client.force_authenticate(user=owner)
+
+    results = {}
+    seeded = 0
+    for size in sorted(sizes):
+        factories.seed(owner, size - seeded, prefix='size-{}'.format(size))
+        seeded = size
+        results[str(size)] = {
+            name: measure(
+                client,
+                reverse(name, kwargs=route_kwargs(name, view_class)),
+                requests
+            ) for name, view_class in named_routes()
+        }
+    return results
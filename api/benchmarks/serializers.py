@@ -0,0 +1,67 @@
+import time
+
+from django.contrib.auth.models import User
+from rest_framework.renderers import JSONRenderer
+
+from .. import compiler
+from .. import factories
+from .. import mixins
+from .. import serializers
+from . import register
+
+FLAT_SERIALIZERS = (
+    serializers.ExperienceSerializer,
+    serializers.EducationSerializer,
+    serializers.CourseSerializer,
+    serializers.TestimonySerializer,
+    serializers.CaseStudySerializer,
+    serializers.SkillChartSerializer,
+)
+
+
+def rows_per_second(serialize, queryset, rows):
+    """Render the queryset until about rows rows were serialized.
+
+    Return the rows serialized per second.
+    """
+    renderer = JSONRenderer()
+    passes = max(1, rows // queryset.count())
+    start = time.perf_counter()
+    for _ in range(passes):
+        renderer.render(serialize(queryset.all()))
+    return passes * queryset.count() / (time.perf_counter() - start)
+
+
+@register('serializers')
+def run(requests=200, sizes=(10, 1000, 100000), **options):
+    """Compare rows per second of the DRF and compiled flat serializers.
+
+    Every case serializes about a hundred rows per request, reading and
+    rendering the whole table in each pass. The DRF side joins the rows it
+    reads like the list views do.
+    """
+    owner = User.objects.create(username='benchmark')
+
+    results = {}
+    seeded = 0
+    for size in sorted(sizes):
+        factories.seed(owner, size - seeded, prefix='size-{}'.format(size))
+        seeded = size
+        results[str(size)] = {}
+        for serializer_class in FLAT_SERIALIZERS:
+            queryset = serializer_class.Meta.model.objects.order_by('pk')
+            select, prefetch = mixins.get_eager_lookups(serializer_class())
+            compiled = compiler.get_compiled(serializer_class)
+            results[str(size)][serializer_class.__name__] = {
+                'drf': {'rows_per_second': rows_per_second(
+                    lambda rows: serializer_class(rows, many=True).data,
+                    queryset.select_related(*select),
+                    requests * 100
+                )},
+                'compiled': {'rows_per_second': rows_per_second(
+                    compiled.serialize,
+                    queryset,
+                    requests * 100
+                )},
+            }
+    return results
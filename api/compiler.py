@@ -0,0 +1,164 @@
+"""Compiled read functions for the flat serializers.
+
+A flat serializer only reads columns of its model, either directly or
+through non null foreign keys such as ``owner.username``. For those,
+``get_compiled()`` generates a function that turns the tuples of
+``values_list()`` into the same dictionaries ``to_representation()``
+returns. No model instances are built and no field is dispatched per row.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields, relations, serializers
+
+from .serializers import select_fields
+
+# Field classes whose to_representation() is a plain type conversion, and
+# the conversion. The exact class must match, so subclasses that override
+# to_representation() keep going through it.
+CONVERTERS = {
+    fields.BooleanField: 'bool',
+    fields.CharField: 'str',
+    fields.EmailField: 'str',
+    fields.FloatField: 'float',
+    fields.IntegerField: 'int',
+    fields.ReadOnlyField: None,
+    fields.SlugField: 'str',
+    fields.URLField: 'str',
+    relations.PrimaryKeyRelatedField: None,
+}
+
+# Number of serializer class and sparse fieldset pairs whose compiled
+# serializers are kept. Fieldsets come from the query string, so the cache
+# is bounded and the least recently used entries are dropped first.
+COMPILED_CACHE_SIZE = 256
+
+
+class CompiledSerializer(object):
+    """Read function generated for a flat serializer class.
+
+    ``lookups`` are the ``values_list()`` lookups read, and ``read(rows)``
+    returns the representation of a list of those tuples.
+    """
+
+    def __init__(self, serializer_class, lookups, read, source):
+        self.serializer_class = serializer_class
+        self.lookups = lookups
+        self.read = read
+        self.source = source
+
+    def values(self, queryset):
+        """Return the queryset of tuples the read function expects."""
+        return queryset.prefetch_related(None).values_list(*self.lookups)
+
+    def serialize(self, queryset):
+        """Return the representation of every row of a queryset."""
+        return self.read(self.values(queryset))
+
+
+def _get_lookup(model, field):
+    """Return the values_list() lookup a serializer field reads.
+
+    Return None when the field reads anything but a column reached through
+    non null foreign keys.
+    """
+    if field.source == '*':
+        return None
+    if type(field) not in CONVERTERS and (
+        isinstance(field, (
+            serializers.BaseSerializer,
+            relations.RelatedField,
+            relations.ManyRelatedField,
+            fields.FileField,
+        )) or type(field).get_attribute is not fields.Field.get_attribute
+    ):
+        return None
+    if isinstance(field, relations.PrimaryKeyRelatedField) and (
+        field.pk_field is not None
+    ):
+        return None
+
+    attrs = field.source.split('.')
+    for attr in attrs[:-1]:
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        # A null relation makes DRF skip the field instead of reading it.
+        if not (
+            model_field.many_to_one or model_field.one_to_one
+        ) or not model_field.concrete or model_field.null:
+            return None
+        model = model_field.related_model
+
+    try:
+        model_field = model._meta.get_field(attrs[-1])
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete:
+        return None
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        if not model_field.many_to_one and not model_field.one_to_one:
+            return None
+    elif model_field.is_relation:
+        return None
+    return '__'.join(attrs)
+
+
+def compile_serializer(serializer_class, fieldset=None):
+    """Generate the read function of a flat serializer class.
+
+    Only the fields kept by the sparse fieldset are read, when given.
+    Return None when some field of the serializer is not a column read.
+    """
+    model = serializer_class.Meta.model
+    fields = serializer_class().fields
+    if fieldset is not None:
+        fields = select_fields(fields, fieldset)
+    readable = [field for field in fields.values() if not field.write_only]
+    lookups, items, namespace = [], [], {'OrderedDict': OrderedDict}
+    for field in readable:
+        lookup = _get_lookup(model, field)
+        if lookup is None:
+            return None
+        if lookup not in lookups:
+            lookups.append(lookup)
+        value = 'v{}'.format(lookups.index(lookup))
+
+        if type(field) in CONVERTERS:
+            convert = CONVERTERS[type(field)]
+        else:
+            convert = 'f{}'.format(len(items))
+            namespace[convert] = field.to_representation
+        if convert is not None:
+            value = 'None if {0} is None else {1}({0})'.format(value, convert)
+        items.append('({!r}, {}),'.format(field.field_name, value))
+    if not lookups:
+        return None
+
+    source = '\n'.join([
+        'def read(rows):',
+        '    return [OrderedDict((',
+    ] + ['        ' + item for item in items] + [
+        '    )) for {}, in rows]'.format(
+            ', '.join('v{}'.format(i) for i in range(len(lookups)))
+        ),
+    ])
+    exec(compile(
+        source,
+        '<compiled {}>'.format(serializer_class.__name__),
+        'exec'
+    ), namespace)
+    return CompiledSerializer(
+        serializer_class,
+        tuple(lookups),
+        namespace['read'],
+        source
+    )
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def get_compiled(serializer_class, fieldset=None):
+    """Return the compiled serializer of a class, or None if it is not flat."""
+    return compile_serializer(serializer_class, fieldset)
@@ -0,0 +1,33 @@
+"""Database connection management.
+
+Connections are kept open between requests for ``CONN_MAX_AGE`` seconds.
+Before a request reuses one, ``check_connections`` makes sure it still
+answers, at most once every ``HEALTH_CHECK_INTERVAL`` seconds, so a
+restarted or failed-over server costs one reconnect instead of an error.
+``ApiConfig.ready()`` connects it to ``request_started``. Threaded workers
+can also use the ``api.db.pooled`` engine, which shares a pool of
+connections between the threads of a process.
+"""
+import time
+
+from django.db import connections
+
+
+def check_connections():
+    """Close the open connections that no longer answer a ping."""
+    now = time.monotonic()
+    for connection in connections.all():
+        interval = connection.settings_dict.get('HEALTH_CHECK_INTERVAL')
+        if interval is None or connection.connection is None:
+            continue
+        checked_at = getattr(connection, 'health_checked_at', None)
+        if checked_at is not None and now - checked_at < interval:
+            continue
+        connection.health_checked_at = now
+        if not connection.is_usable():
+            connection.close()
+
+
+def check_database_connections(sender, **kwargs):
+    """Receiver of request_started running check_connections()."""
+    check_connections()
@@ -0,0 +1,209 @@
+from . import models
+from . import snapshots
+from . import versions
+
+BATCH_SIZE = 1000
+
+
+def _bulk_insert(model, objs):
+    """Insert objs in batches of BATCH_SIZE rows."""
+    model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+
+
+def _bulk_create(model, objs):
+    """Insert objs in batches and return them with their primary keys.
+
+    Not every database backend sets primary keys on bulk inserts, so the
+    freshly inserted rows are read back instead.
+    """
+    _bulk_insert(model, objs)
+    return list(model.objects.order_by('-pk')[:len(objs)])[::-1]
+
+
+def seed(owner, count, prefix='seed'):
+    """Insert count rows of every api model owned by owner.
+
+    Rows are inserted with bulk_create so seeding large tables stays fast.
+    Return a mapping of each model to the rows created for it.
+    """
+    names = ['{}-{}'.format(prefix, i) for i in range(count)]
+
+    sub_menu_items = _bulk_create(models.SubMenuItem, [
+        models.SubMenuItem(
+            owner=owner,
+            order=i,
+            title=name,
+            url='sub-menu/{}'.format(name)
+        ) for i, name in enumerate(names)
+    ])
+    menu_items = _bulk_create(models.MenuItem, [
+        models.MenuItem(owner=owner, order=i, title=name, url=name)
+        for i, name in enumerate(names)
+    ])
+    menus = _bulk_create(models.Menu, [
+        models.Menu(owner=owner, name=name) for name in names
+    ])
+    _bulk_insert(models.MenuItem.sub_menu_items.through, [
+        models.MenuItem.sub_menu_items.through(
+            menuitem_id=item.pk,
+            submenuitem_id=sub_item.pk
+        ) for item, sub_item in zip(menu_items, sub_menu_items)
+    ])
+    _bulk_insert(models.Menu.menu_items.through, [
+        models.Menu.menu_items.through(menu_id=menu.pk, menuitem_id=item.pk)
+        for menu, item in zip(menus, menu_items)
+    ])
+
+    skill_charts = _bulk_create(models.SkillChart, [
+        models.SkillChart(
+            name=name,
+            title1='One',
+            title2='Two',
+            title3='Three',
+            title4='Four',
+            title5='Five'
+        ) for name in names
+    ])
+    skill_categories = _bulk_create(models.SkillCategory, [
+        models.SkillCategory(owner=owner, name=name, url=name)
+        for name in names
+    ])
+    skills = _bulk_create(models.Skill, [
+        models.Skill(
+            owner=owner,
+            order=i,
+            name=name,
+            logo='logo.png',
+            last_project='Portfolio',
+            skill_chart=chart,
+            website='https://www.example.com/',
+            documentation='https://www.example.com/docs/',
+            github='https://github.com/example',
+            why='Because'
+        ) for i, (name, chart) in enumerate(zip(names, skill_charts))
+    ])
+    _bulk_insert(models.Skill.category.through, [
+        models.Skill.category.through(
+            skill_id=skill.pk,
+            skillcategory_id=category.pk
+        ) for skill, category in zip(skills, skill_categories)
+    ])
+
+    experiences = _bulk_create(models.Experience, [
+        models.Experience(
+            owner=owner,
+            order=i,
+            job_title=name,
+            company='Company',
+            start_date='2018',
+            end_date='2019',
+            place='Bogota',
+            summary='Summary'
+        ) for i, name in enumerate(names)
+    ])
+
+    program_categories = _bulk_create(models.ProgramCategory, [
+        models.ProgramCategory(owner=owner, name=name, url=name)
+        for name in names
+    ])
+    programs = _bulk_create(models.Program, [
+        models.Program(
+            owner=owner,
+            program_category=category,
+            name=name,
+            logo='logo.png',
+            summary='Summary',
+            website='https://www.example.com/'
+        ) for name, category in zip(names, program_categories)
+    ])
+
+    educations = _bulk_create(models.Education, [
+        models.Education(
+            owner=owner,
+            order=i,
+            place=name,
+            place_logo='logo.png',
+            description='Description',
+            website='https://www.example.com/'
+        ) for i, name in enumerate(names)
+    ])
+    courses = _bulk_create(models.Course, [
+        models.Course(
+            owner=owner,
+            order=i,
+            place=name,
+            place_logo='logo.png',
+            course_title=name,
+            description='Description',
+            main_focus='Main focus',
+            website='https://www.example.com/'
+        ) for i, name in enumerate(names)
+    ])
+    testimonies = _bulk_create(models.Testimony, [
+        models.Testimony(
+            owner=owner,
+            order=i,
+            person=name,
+            job='Job',
+            testimony='Testimony',
+            avatar='avatar.png',
+            linkedin='https://www.linkedin.com/'
+        ) for i, name in enumerate(names)
+    ])
+    case_studies = _bulk_create(models.CaseStudy, [
+        models.CaseStudy(
+            owner=owner,
+            order=i,
+            title=name,
+            subtitle='Subtitle',
+            summary='Summary',
+            url=name,
+            tags='design, ux'
+        ) for i, name in enumerate(names)
+    ])
+    tags = [
+        models.Tag.objects.get_or_create(name=name)[0]
+        for name in models.parse_tags('design, ux')
+    ]
+    _bulk_insert(models.CaseStudy.tag_set.through, [
+        models.CaseStudy.tag_set.through(casestudy_id=study.pk, tag_id=tag.pk)
+        for study in case_studies for tag in tags
+    ])
+
+    resource_categories = _bulk_create(models.ResourceCategory, [
+        models.ResourceCategory(owner=owner, name=name, url=name)
+        for name in names
+    ])
+    resources = _bulk_create(models.Resource, [
+        models.Resource(
+            owner=owner,
+            resource_category=category,
+            reference=name,
+            description='Description',
+            price=9.99,
+            link='https://www.example.com/'
+        ) for name, category in zip(names, resource_categories)
+    ])
+
+    # Bulk inserts do not send post_save, so drop the cached documents here.
+    snapshots.invalidate(owner.pk)
+    versions.invalidate(owner.pk)
+
+    return {
+        models.SubMenuItem: sub_menu_items,
+        models.MenuItem: menu_items,
+        models.Menu: menus,
+        models.SkillChart: skill_charts,
+        models.SkillCategory: skill_categories,
+        models.Skill: skills,
+        models.Experience: experiences,
+        models.ProgramCategory: program_categories,
+        models.Program: programs,
+        models.Education: educations,
+        models.Course: courses,
+        models.Testimony: testimonies,
+        models.CaseStudy: case_studies,
+        models.Tag: tags,
+        models.ResourceCategory: resource_categories,
+        models.Resource: resources,
+    }
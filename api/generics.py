@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+from rest_framework import generics, serializers
+from rest_framework.response import Response
+
+from . import mixins
+from . import signals
+from .serializers import ReorderSerializer
+
+
+class ListAPIView(
+    mixins.ProfilingMixin,
+    mixins.OwnerScopedMixin,
+    mixins.EagerLoadingMixin,
+    mixins.ConditionalGetMixin,
+    mixins.StreamingListMixin,
+    mixins.CompiledListMixin,
+    generics.ListAPIView
+):
+    """Base class of the read only list views of the api."""
+    sparse_fieldsets = True
+
+
+class ListCreateAPIView(
+    mixins.ProfilingMixin,
+    mixins.BulkCreateMixin,
+    mixins.OwnerScopedMixin,
+    mixins.EagerLoadingMixin,
+    mixins.ConditionalGetMixin,
+    mixins.StreamingListMixin,
+    mixins.CompiledListMixin,
+    generics.ListCreateAPIView
+):
+    """Base class of the list and create views of the api."""
+    sparse_fieldsets = True
+
+
+class RetrieveUpdateDestroyAPIView(
+    mixins.ProfilingMixin,
+    mixins.OwnerScopedMixin,
+    mixins.EagerLoadingMixin,
+    mixins.ConditionalGetMixin,
+    generics.RetrieveUpdateDestroyAPIView
+):
+    """Base class of the detail views of the api."""
+    sparse_fieldsets = True
+
+
+class ReorderAPIView(
+    mixins.ProfilingMixin,
+    mixins.OwnerScopedMixin,
+    generics.GenericAPIView
+):
+    """Base class of the views rewriting the order column of a collection.
+
+    A POST of ``[{"id": 1, "order": 0}, ...]`` updates every listed row
+    with one ``UPDATE ... CASE`` statement in one transaction.
+    """
+    serializer_class = ReorderSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False
+        )
+        serializer.is_valid(raise_exception=True)
+        orders = {row['id']: row['order'] for row in serializer.validated_data}
+
+        queryset = self.filter_queryset(self.get_queryset())
+        with transaction.atomic():
+            rows = queryset.filter(pk__in=orders).select_for_update()
+            found = set(rows.values_list('pk', flat=True))
+            errors = [
+                {} if row['id'] in found else {'id': ['Not found.']}
+                for row in serializer.validated_data
+            ]
+            if any(errors):
+                raise serializers.ValidationError(errors)
+            queryset.model.objects.filter(pk__in=found).update(
+                order=Case(
+                    *[When(pk=pk, then=Value(order))
+                      for pk, order in orders.items()],
+                    output_field=IntegerField()
+                ),
+                modified_at=timezone.now()
+            )
+
+        signals.reordered.send(
+            sender=queryset.model,
+            pks=sorted(found),
+            owner_id=request.user.id
+        )
+        return Response(serializer.data)
@@ -0,0 +1,69 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Run one of the api benchmark suites against a test database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'suite',
+            choices=sorted(benchmarks.SUITES),
+            help='Name of the benchmark suite to run.'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Number of requests to time per case.'
+        )
+        parser.add_argument(
+            '--sizes',
+            type=lambda value: [int(size) for size in value.split(',')],
+            default=[10, 1000, 100000],
+            help='Comma separated table sizes to seed, e.g. 10,1000,100000.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results to this JSON file.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Fail when the results regress against this JSON baseline.'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.25,
+            help='Largest tolerated regression, as a fraction.'
+        )
+
+    def handle(self, *args, **options):
+        suite = benchmarks.SUITES[options.pop('suite')]
+        with benchmarks.test_database():
+            results = suite(**options)
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                regressions = benchmarks.compare(
+                    json.load(baseline),
+                    results,
+                    options['threshold']
+                )
+            for path, old, new in regressions:
+                self.stderr.write('{}: {} -> {}'.format(path, old, new))
+            if regressions:
+                raise CommandError(
+                    '{} metrics regressed by more than {:.0%}.'.format(
+                        len(regressions),
+                        options['threshold']
+                    )
+                )
@@ -0,0 +1,140 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.generics import GenericAPIView
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ... import models
+from ... import urls
+
+SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def _sample_kwargs(pattern):
+    """Return url kwargs that resolve the given pattern."""
+    kwargs = {}
+    for name in pattern.pattern.converters:
+        if name == 'pk':
+            kwargs[name] = 1
+        elif 'skills/' in str(pattern.pattern):
+            kwargs[name] = models.SkillCategory.objects.values_list(
+                'url',
+                flat=True
+            ).first() or 'sample'
+        else:
+            kwargs[name] = models.ProgramCategory.objects.values_list(
+                'url',
+                flat=True
+            ).first() or 'sample'
+    return kwargs
+
+
+def view_querysets(page_size, user=None):
+    """Yield the route name and the queryset run by every api view.
+
+    Detail views are filtered by primary key and list views are cut to the
+    first page in the ordering their paginator seeks on, which is what a
+    client actually asks for. The querysets are scoped to the rows of user,
+    a user with no rows unless one is given, so the planner sees the same
+    ``owner_id = <id>`` filters production runs.
+    """
+    if user is None:
+        user = User(pk=0, username='check_indexes')
+    factory = APIRequestFactory()
+    seen = set()
+    for pattern in urls.urlpatterns:
+        view_class = getattr(getattr(pattern, 'callback', None), 'cls', None)
+        if (view_class is None or pattern.name in seen or
+                not hasattr(view_class, 'get') or
+                not issubclass(view_class, GenericAPIView)):
+            continue
+        seen.add(pattern.name)
+
+        kwargs = _sample_kwargs(pattern)
+        request = Request(factory.get('/'))
+        request.user = user
+        view = view_class(
+            request=request,
+            args=(),
+            kwargs=kwargs,
+            format_kwarg=None
+        )
+        queryset = view.filter_queryset(view.get_queryset())
+        if 'pk' in kwargs:
+            queryset = queryset.filter(pk=kwargs['pk'])
+        else:
+            ordering = view.paginator.get_ordering(request, queryset, view)
+            queryset = queryset.order_by(*ordering)[:page_size]
+        yield pattern.name, queryset
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the queryset of every api view and fail when one of them '
+        'runs a sequential scan on a large table.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=1000,
+            help='Smallest table, in estimated rows, that must not be scanned.'
+        )
+        parser.add_argument(
+            '--user',
+            help=(
+                'Username whose rows the view querysets are scoped to, '
+                'the first user by default.'
+            )
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=25,
+            help='Number of rows list views are cut to.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The index coverage check needs PostgreSQL.')
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'"
+            )
+            sizes = dict(cursor.fetchall())
+
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(
+                    'No user named {}.'.format(options['user'])
+                )
+        else:
+            user = User.objects.order_by('pk').first()
+
+        offenders = []
+        for name, queryset in view_querysets(options['page_size'], user):
+            plan = queryset.explain()
+            for table in SEQ_SCAN.findall(plan):
+                if sizes.get(table, 0) >= options['min_rows']:
+                    offenders.append((name, table, int(sizes[table])))
+            if options['verbosity'] > 1:
+                self.stdout.write('{}\n{}\n'.format(name, plan))
+
+        for name, table, rows in offenders:
+            self.stderr.write('{}: sequential scan on {} (~{} rows)'.format(
+                name,
+                table,
+                rows
+            ))
+        if offenders:
+            raise CommandError(
+                '{} view querysets scan large tables.'.format(len(offenders))
+            )
+        self.stdout.write('Every view queryset is covered by an index.')
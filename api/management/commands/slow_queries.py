@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from ... import slowqueries
+
+
+class Command(BaseCommand):
+    help = 'Dump the slow query log, the newest record first.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Write the records as a JSON list.'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Empty the log once it is dumped.'
+        )
+
+    def handle(self, *args, **options):
+        records = slowqueries.get_records()
+        if options['json']:
+            self.stdout.write(json.dumps(records, indent=2))
+        else:
+            for record in records:
+                self.stdout.write('{} ms  {}  {}  {}'.format(
+                    record['duration_ms'],
+                    record['time'],
+                    record['view'] or '-',
+                    record['field'] or '-'
+                ))
+                self.stdout.write(record['sql'])
+                self.stdout.write('params: {}'.format(record['params']))
+                for frame in record['stack']:
+                    self.stdout.write('  ' + frame)
+                if record['explain']:
+                    self.stdout.write(record['explain'])
+                self.stdout.write('')
+            self.stdout.write('{} slow queries.'.format(len(records)))
+        if options['clear']:
+            slowqueries.clear()
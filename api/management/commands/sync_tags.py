@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ... import models
+
+
+class Command(BaseCommand):
+    help = 'Fill the tag table from the tags string of every case study.'
+
+    def handle(self, *args, **options):
+        count = 0
+        for case_study in models.CaseStudy.objects.iterator():
+            case_study.sync_tags()
+            count += 1
+        self.stdout.write('{} case studies synced.'.format(count))
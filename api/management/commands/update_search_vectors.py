@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from ... import search
+
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search column of every searchable row.'
+
+    def handle(self, *args, **options):
+        for model in search.SEARCH_FIELDS:
+            updated = search.update_search_vectors(model)
+            self.stdout.write('{}: {} rows updated.'.format(
+                model.__name__,
+                updated
+            ))
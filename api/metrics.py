@@ -0,0 +1,416 @@
+"""Request metrics of the api, aggregated across the worker processes.
+
+Every process counts in memory and writes its counters to its own JSON
+file in METRICS_DIR, at most every METRICS_FLUSH_INTERVAL seconds. The
+``/metrics/`` view sums the files of every process into the Prometheus
+text format, so serving it needs neither the database nor a metrics
+server.
+
+The counters of a process are merged into the ``dead.json`` file when
+it exits, or when a scrape finds that its pid is gone, and its own file
+is removed. The totals thus keep growing across worker restarts and the
+directory does not fill up with the files of old workers. A file left by
+an earlier process with the same pid is merged the first time the new
+process writes. METRICS_DIR must only be shared by the processes of one
+host, since pids are checked with ``os.kill()``.
+"""
+import atexit
+import bisect
+import fcntl
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from . import authentication
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+DEAD_FILE = 'dead.json'
+LOCK_FILE = '.lock'
+
+# Type and help text of every metric, in exposition order.
+METRICS = OrderedDict([
+    ('api_requests_total', (
+        'counter',
+        'Requests answered, by route, method and status.',
+    )),
+    ('api_request_duration_seconds', (
+        'histogram',
+        'Time to answer a request, by route.',
+    )),
+    ('api_db_queries_total', (
+        'counter',
+        'SQL queries run while answering requests, by route.',
+    )),
+    ('api_response_size_bytes', (
+        'histogram',
+        'Size of the response bodies, by route.',
+    )),
+    ('api_cache_requests_total', (
+        'counter',
+        'Cache lookups, by cache and result.',
+    )),
+])
+
+
+class Registry(object):
+    """Counters and histograms of the current process."""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.flushed_at = 0.0
+        # The directory whose file this process owns, and the id telling
+        # this process apart from earlier ones with the same pid. Both are
+        # reset in a forked child, see flush().
+        self.pid = None
+        self.process = None
+        self.directory = None
+        self._lock = threading.Lock()
+
+    def inc(self, name, labels, value=1):
+        """Add value to a counter."""
+        key = name, labels
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        """Record one value in a histogram."""
+        key = name, labels
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                # The last count is the overflow slot of the +Inf bucket.
+                histogram = self.histograms[key] = {
+                    'buckets': list(buckets),
+                    'counts': [0] * (len(buckets) + 1),
+                    'sum': 0,
+                    'count': 0,
+                }
+            histogram['counts'][bisect.bisect_left(buckets, value)] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def as_dict(self):
+        """Return the metrics in the JSON layout of the process files."""
+        with self._lock:
+            counters = [
+                [name, list(labels), value]
+                for (name, labels), value in self.counters.items()
+            ]
+            histograms = [
+                [
+                    name,
+                    list(labels),
+                    dict(histogram, counts=list(histogram['counts'])),
+                ]
+                for (name, labels), histogram in self.histograms.items()
+            ]
+        for name, stats in (
+            ('token', authentication.get_token_stats()),
+            ('credentials', authentication.get_credential_stats()),
+        ):
+            for result, value in (
+                ('hit', stats['local_hits'] + stats['shared_hits']),
+                ('miss', stats['misses']),
+            ):
+                counters.append([
+                    'api_cache_requests_total',
+                    [['cache', name], ['result', result]],
+                    value,
+                ])
+        return {'counters': counters, 'histograms': histograms}
+
+
+registry = Registry()
+
+
+def get_directory():
+    """Return the directory holding the metric files of the processes."""
+    return getattr(
+        settings,
+        'METRICS_DIR',
+        os.path.join(settings.BASE_DIR, '.metrics')
+    )
+
+
+def _get_path(directory, pid=None):
+    """Return the metric file of a process."""
+    return os.path.join(directory, '{}.json'.format(pid or os.getpid()))
+
+
+@contextmanager
+def _locked(directory):
+    """Hold the lock guarding the merges into the dead file."""
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read(path):
+    """Return the metrics of a file, or None if it is missing or torn."""
+    try:
+        with open(path) as source:
+            return json.load(source)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, data):
+    """Replace a metric file in one step, so readers never see half of it."""
+    directory = os.path.dirname(path)
+    fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as output:
+        json.dump(data, output)
+    os.replace(temp, path)
+
+
+def _bury(directory, data):
+    """Add the metrics of a finished process to the dead file.
+
+    The caller holds the lock of the directory.
+    """
+    path = os.path.join(directory, DEAD_FILE)
+    counters, histograms = _sum([_read(path), data])
+    _write(path, {
+        'counters': [
+            [name, list(labels), value]
+            for (name, labels), value in counters.items()
+        ],
+        'histograms': [
+            [name, list(labels), histogram]
+            for (name, labels), histogram in histograms.items()
+        ],
+    })
+
+
+def _is_alive(pid):
+    """Return whether a process with the given pid exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _claim(directory):
+    """Make this process the owner of its file in directory.
+
+    A file of the same name left by an earlier process, whose pid was
+    reused, is merged into the dead file instead of being overwritten.
+    """
+    path = _get_path(directory)
+    with _locked(directory):
+        data = _read(path)
+        if data is not None and data.get('process') != registry.process:
+            _bury(directory, data)
+            os.remove(path)
+    registry.directory = directory
+
+
+def flush(force=False):
+    """Write the metrics of this process to its file.
+
+    Nothing is written when the last write is more recent than
+    METRICS_FLUSH_INTERVAL, unless force is True.
+    """
+    now = time.monotonic()
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1)
+    if not force and now - registry.flushed_at < interval:
+        return
+    registry.flushed_at = now
+
+    if registry.pid != os.getpid():
+        registry.pid = os.getpid()
+        registry.process = uuid.uuid4().hex
+        registry.directory = None
+    directory = get_directory()
+    if registry.directory != directory:
+        os.makedirs(directory, exist_ok=True)
+        _claim(directory)
+    data = registry.as_dict()
+    data['process'] = registry.process
+    _write(_get_path(directory), data)
+
+
+def prune():
+    """Merge the files of the processes that are gone into the dead file."""
+    directory = get_directory()
+    if not os.path.isdir(directory):
+        return
+    with _locked(directory):
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            name = os.path.basename(path)[:-len('.json')]
+            if not name.isdigit() or _is_alive(int(name)):
+                continue
+            data = _read(path)
+            if data is not None:
+                _bury(directory, data)
+            os.remove(path)
+
+
+def mark_process_dead():
+    """Merge the metrics of this process into the dead file on exit.
+
+    Nothing is done unless this process owns a file in METRICS_DIR, so a
+    process that moved to another directory, like the test runner, does
+    not write into the live one.
+    """
+    directory = get_directory()
+    path = _get_path(directory)
+    owned = registry.pid == os.getpid() and registry.directory == directory
+    if not owned or not os.path.exists(path):
+        return
+    with _locked(directory):
+        _bury(directory, registry.as_dict())
+        os.remove(path)
+    registry.directory = None
+
+
+atexit.register(mark_process_dead)
+
+
+def count_cache(name, hit):
+    """Count one lookup in a cache."""
+    registry.inc(
+        'api_cache_requests_total',
+        (('cache', name), ('result', 'hit' if hit else 'miss'))
+    )
+
+
+def record_request(route, method, status, seconds, queries, size):
+    """Record an answered request.
+
+    size is None for streamed responses, whose size is not known.
+    """
+    registry.inc(
+        'api_requests_total',
+        (('route', route), ('method', method), ('status', str(status)))
+    )
+    labels = (('route', route),)
+    registry.observe(
+        'api_request_duration_seconds',
+        labels,
+        seconds,
+        LATENCY_BUCKETS
+    )
+    registry.inc('api_db_queries_total', labels, queries)
+    if size is not None:
+        registry.observe('api_response_size_bytes', labels, size, SIZE_BUCKETS)
+    flush()
+
+
+def _sum(sources):
+    """Return the metrics of many files, summed per series.
+
+    Missing files, given as None, are skipped.
+    """
+    counters, histograms = OrderedDict(), OrderedDict()
+    for data in sources:
+        if data is None:
+            continue
+        for name, labels, value in data['counters']:
+            key = name, tuple(tuple(label) for label in labels)
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, histogram in data['histograms']:
+            key = name, tuple(tuple(label) for label in labels)
+            total = histograms.get(key)
+            if total is None:
+                histograms[key] = dict(
+                    histogram,
+                    counts=list(histogram['counts'])
+                )
+                continue
+            total['counts'] = [
+                a + b for a, b in zip(total['counts'], histogram['counts'])
+            ]
+            total['sum'] += histogram['sum']
+            total['count'] += histogram['count']
+    return counters, histograms
+
+
+def collect():
+    """Return the metrics of every process, summed per series."""
+    return _sum(
+        _read(path) for path in
+        sorted(glob.glob(os.path.join(get_directory(), '*.json')))
+    )
+
+
+def _format_labels(labels):
+    """Return the Prometheus label set of a tuple of name, value pairs."""
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n')
+        ) for name, value in labels
+    ) + '}'
+
+
+def _format_number(value):
+    """Return a number the way the Prometheus text format writes it."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Return the metrics of every process in the Prometheus text format."""
+    flush(force=True)
+    prune()
+    counters, histograms = collect()
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append('# HELP {} {}'.format(name, help_text))
+        lines.append('# TYPE {} {}'.format(name, kind))
+        if kind == 'counter':
+            for (series, labels), value in sorted(counters.items()):
+                if series == name:
+                    lines.append('{}{} {}'.format(
+                        name,
+                        _format_labels(labels),
+                        _format_number(value)
+                    ))
+            continue
+        for (series, labels), histogram in sorted(histograms.items()):
+            if series != name:
+                continue
+            cumulative = 0
+            bounds = histogram['buckets'] + [float('inf')]
+            for bound, count in zip(bounds, histogram['counts']):
+                cumulative += count
+                lines.append('{}_bucket{} {}'.format(
+                    name,
+                    _format_labels(labels + (('le', _format_number(bound)),)),
+                    cumulative
+                ))
+            lines.append('{}_sum{} {}'.format(
+                name,
+                _format_labels(labels),
+                _format_number(histogram['sum'])
+            ))
+            lines.append('{}_count{} {}'.format(
+                name,
+                _format_labels(labels),
+                histogram['count']
+            ))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,209 @@
+import hashlib
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.core.cache import cache
+from django.db import connections
+from django.middleware import clickjacking, csrf
+
+from . import metrics
+from . import profiling
+from . import routers
+from . import slowqueries
+
+logger = logging.getLogger('api.profiling')
+
+
+def _client_key(request):
+    """Return the cache key pinning the reads of a client to the primary."""
+    client = (
+        request.META.get('HTTP_AUTHORIZATION') or
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME) or
+        request.META.get('REMOTE_ADDR', '')
+    )
+    return 'replicas:pinned:{}'.format(
+        hashlib.sha256(client.encode()).hexdigest()
+    )
+
+
+class ReplicaStickinessMiddleware(object):
+    """Send the reads of a client to the primary right after it wrote.
+
+    Once a request writes, the client's reads skip the replicas for
+    REPLICA_STICKY_SECONDS, so it sees its own writes at once.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'DATABASE_REPLICAS', ()):
+            return self.get_response(request)
+
+        key = _client_key(request)
+        routers.start_request(pinned=cache.get(key) is not None)
+        try:
+            response = self.get_response(request)
+            if routers.wrote():
+                cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
+        finally:
+            routers.start_request()
+        return response
+
+
+def uses_full_stack(request):
+    """Return True when the request needs the full middleware stack.
+
+    Only the paths in FULL_MIDDLEWARE_PATHS, the admin and the browsable
+    API login, use sessions, messages and CSRF. The token and basic
+    authenticated API routes get by without them.
+    """
+    return request.path_info.startswith(
+        tuple(getattr(settings, 'FULL_MIDDLEWARE_PATHS', ('/',)))
+    )
+
+
+class FullStackOnlyMixin(object):
+    """Run a middleware on the full stack paths only.
+
+    The middleware classes below subclass the Django ones, so checks such
+    as the admin's still find them in MIDDLEWARE.
+    """
+
+    def __call__(self, request):
+        if not uses_full_stack(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(
+    FullStackOnlyMixin,
+    sessions_middleware.SessionMiddleware
+):
+    """Session middleware for the full stack paths."""
+
+
+class CsrfViewMiddleware(FullStackOnlyMixin, csrf.CsrfViewMiddleware):
+    """CSRF middleware for the full stack paths."""
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if not uses_full_stack(request):
+            return None
+        return super().process_view(
+            request,
+            callback,
+            callback_args,
+            callback_kwargs
+        )
+
+
+class AuthenticationMiddleware(
+    FullStackOnlyMixin,
+    auth_middleware.AuthenticationMiddleware
+):
+    """Authentication middleware for the full stack paths."""
+
+
+class MessageMiddleware(
+    FullStackOnlyMixin,
+    messages_middleware.MessageMiddleware
+):
+    """Message middleware for the full stack paths."""
+
+
+class XFrameOptionsMiddleware(clickjacking.XFrameOptionsMiddleware):
+    """Clickjacking protection for the full stack paths and HTML pages.
+
+    The browsable API renders HTML on the API routes too, so those pages
+    keep their X-Frame-Options header.
+    """
+
+    def process_response(self, request, response):
+        if (uses_full_stack(request) or
+                response.get('Content-Type', '').startswith('text/html')):
+            return super().process_response(request, response)
+        return response
+
+
+class ProfilingMiddleware(object):
+    """Time the phases of signed or sampled requests, see api.profiling.
+
+    Profiled responses carry a Server-Timing header and are logged as one
+    JSON line. Other requests only pay for the header and sampling check.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.should_profile(request):
+            return self.get_response(request)
+        with profiling.profile() as profile:
+            response = self.get_response(request)
+        response['Server-Timing'] = profile.server_timing()
+        logger.info(profiling.log_line(request, response, profile))
+        return response
+
+
+class _QueryCounter(object):
+    """Database execute wrapper counting the queries of a request."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware(object):
+    """Count, time and size every request by route, see api.metrics.
+
+    The route is the name of the matched URL pattern, or ``unmatched``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        metrics.record_request(
+            route=(match and match.url_name) or 'unmatched',
+            method=request.method,
+            status=response.status_code,
+            seconds=time.perf_counter() - start,
+            queries=counter.count,
+            size=None if response.streaming else len(response.content)
+        )
+        return response
+
+
+class SlowQueryMiddleware(object):
+    """Record the slow SQL statements of each request, see api.slowqueries.
+
+    Nothing is wrapped when SLOW_QUERY_THRESHOLD_MS is 0.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = slowqueries.get_threshold()
+        if threshold is None:
+            return self.get_response(request)
+        recorder = slowqueries.Recorder(threshold, request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
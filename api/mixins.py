@@ -0,0 +1,487 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from itertools import islice
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import relations, serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from . import compiler
+from . import profiling
+from . import versions
+from .serializers import BulkCreateListSerializer
+
+
+def _follow(model, attrs):
+    """Follow a source path through the model relations.
+
+    Return the lookup of the relations walked, the model it ends on and
+    whether any step of it is a to-many relation.
+    """
+    path, many = [], False
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        path.append(attr)
+        many = many or field.many_to_many or field.one_to_many
+        model = field.related_model
+    return '__'.join(path), model, many
+
+
+def _collect(serializer, model, prefix, prefetching, select, prefetch):
+    """Collect the relation lookups read by the fields of a serializer."""
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        attrs = field.source.split('.')
+        nested = None
+        if isinstance(field, serializers.ListSerializer):
+            nested = field.child
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = field
+        elif isinstance(field, relations.PrimaryKeyRelatedField):
+            # A single primary key is read from the local column.
+            if len(attrs) == 1:
+                continue
+        elif not isinstance(field, (
+            relations.RelatedField,
+            relations.ManyRelatedField,
+        )):
+            # Plain fields only need the relations before the attribute.
+            attrs = attrs[:-1]
+
+        path, related_model, many = _follow(model, attrs)
+        if not path:
+            continue
+        lookup = prefix + path
+        if many or prefetching:
+            prefetch.add(lookup)
+        else:
+            select.add(lookup)
+        if nested is not None:
+            _collect(
+                nested,
+                related_model,
+                lookup + '__',
+                prefetching or many,
+                select,
+                prefetch
+            )
+
+
+def _get_columns(serializer):
+    """Return the only() lookups of the columns a serializer reads.
+
+    Return None when a field reads anything but columns and relations,
+    such as a property or the whole instance.
+    """
+    model = serializer.Meta.model
+    columns = set()
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            return None
+        attrs = field.source.split('.')
+        if isinstance(field, (
+            serializers.BaseSerializer,
+            relations.RelatedField,
+            relations.ManyRelatedField,
+        )):
+            path, related_model, many = _follow(model, attrs)
+            if not path:
+                return None
+            # Prefetched relations only need the primary key.
+            if not many:
+                columns.add(path)
+            continue
+
+        path, related_model, many = _follow(model, attrs[:-1])
+        if many or path != '__'.join(attrs[:-1]):
+            return None
+        try:
+            related_model._meta.get_field(attrs[-1])
+        except FieldDoesNotExist:
+            return None
+        columns.add('__'.join(attrs))
+    return columns
+
+
+# Eager lookups and columns of the serializer class and sparse fieldset
+# pairs used most recently. Building the fields of a serializer is costly
+# and they only depend on these two. Fieldsets come from the query string,
+# so at most EAGER_LOOKUPS_CACHE_SIZE pairs are kept.
+EAGER_LOOKUPS_CACHE_SIZE = 256
+_eager_lookups = OrderedDict()
+_eager_lookups_lock = threading.Lock()
+
+
+def _get_cache_key(serializer):
+    """Return the key of a serializer in the lookup caches."""
+    return type(serializer), getattr(serializer, 'sparse_fieldset', None)
+
+
+def _get_eager_state(serializer):
+    """Return the lookups and columns of a serializer, from the cache."""
+    key = _get_cache_key(serializer)
+    with _eager_lookups_lock:
+        state = _eager_lookups.get(key)
+        if state is not None:
+            _eager_lookups.move_to_end(key)
+            return state
+    select, prefetch = set(), set()
+    _collect(
+        serializer,
+        serializer.Meta.model,
+        '',
+        False,
+        select,
+        prefetch
+    )
+    state = sorted(select), sorted(prefetch), _get_columns(serializer)
+    with _eager_lookups_lock:
+        _eager_lookups[key] = state
+        while len(_eager_lookups) > EAGER_LOOKUPS_CACHE_SIZE:
+            _eager_lookups.popitem(last=False)
+    return state
+
+
+def get_eager_lookups(serializer):
+    """Return the select_related and prefetch_related lookups of a serializer.
+
+    The lookups cover every relation the serializer reads, including
+    dotted sources such as ``owner.username`` and nested serializers.
+    """
+    select, prefetch = _get_eager_state(serializer)[:2]
+    return list(select), list(prefetch)
+
+
+def get_columns(serializer):
+    """Return the only() lookups of the columns a serializer reads, or None.
+
+    None means the serializer reads more than plain columns, so every
+    column has to be loaded.
+    """
+    columns = _get_eager_state(serializer)[2]
+    return None if columns is None else sorted(columns)
+
+
+def _has_owner(model):
+    """Return True when the rows of the model belong to a user."""
+    try:
+        model._meta.get_field('owner')
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def filter_by_owner(queryset, user):
+    """Keep the rows of a queryset owned by user.
+
+    Querysets of models without an owner are returned unchanged.
+    """
+    if not _has_owner(queryset.model):
+        return queryset
+    return queryset.filter(owner_id=user.id)
+
+
+class OwnerScopedMixin(object):
+    """Only let users see and change the rows they own.
+
+    The rows are filtered on ``owner_id`` in SQL, so the rows of other
+    users are never fetched: they are left out of lists and detail views
+    answer 404 for them.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return filter_by_owner(queryset, self.request.user)
+
+
+class EagerLoadingMixin(object):
+    """Load the relations read by the serializer along with the queryset.
+
+    List and detail requests then run a fixed number of queries no matter
+    how many rows they return. Requests with a sparse fieldset also leave
+    out the columns and joins of the fields they do not ask for.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer()
+        select, prefetch = get_eager_lookups(serializer)
+        if getattr(serializer, 'sparse_fieldset', None) is not None:
+            queryset = self.defer_columns(queryset, get_columns(serializer))
+        if select:
+            queryset = queryset.select_related(*select)
+        seen = set(
+            getattr(lookup, 'prefetch_to', lookup)
+            for lookup in queryset._prefetch_related_lookups
+        )
+        prefetch = [lookup for lookup in prefetch if lookup not in seen]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def defer_columns(self, queryset, columns):
+        """Load only the given columns, the owner and the ordering columns.
+
+        The joins of the queryset are dropped as well, filter_queryset()
+        adds back those the serializer reads. Nothing is deferred when
+        columns is None.
+        """
+        if columns is None:
+            return queryset
+        columns = set(columns)
+        # Object permissions compare owner ids.
+        if _has_owner(queryset.model):
+            columns.add('owner')
+        for name in getattr(self, 'ordering', None) or ():
+            name = name.lstrip('-')
+            try:
+                queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            columns.add(name)
+        return queryset.select_related(None).only(*sorted(columns))
+
+
+class ConditionalGetMixin(object):
+    """Answer conditional GET requests without running the serializer.
+
+    The ETag and Last-Modified headers are derived from the data version
+    of the requesting user, see api.versions, which every save, delete and
+    relation change of the user's rows bumps. A request whose
+    ``If-None-Match`` or ``If-Modified-Since`` still matches gets a 304
+    straight away, without a query.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            partial(super().list, request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            partial(super().retrieve, request, *args, **kwargs)
+        )
+
+    def get_conditional_state(self):
+        """Return a summary of the data behind the response.
+
+        Return a ``(state, last_modified)`` pair, where state changes
+        whenever the response would and last_modified is the time of the
+        last change as a timestamp, or None when unknown.
+        """
+        return versions.get_version(self.request.user.pk)
+
+    def conditional_response(self, request, respond):
+        """Return a 304 when the client copy is current, else respond()."""
+        state, last_modified = self.get_conditional_state()
+        if state is None:
+            return respond()
+
+        etag = quote_etag(hashlib.md5(repr((
+            state,
+            request.get_full_path(),
+            request.accepted_media_type,
+            request.user.pk,
+        )).encode()).hexdigest())
+        # HTTP dates have a resolution of one second, so a date within the
+        # current second could hide a change made later in that second.
+        # It is only sent once the second is over.
+        if last_modified is not None:
+            if time.time() - last_modified < 1:
+                last_modified = None
+            else:
+                last_modified = int(last_modified)
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified
+        )
+        if response is None:
+            response = respond()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class StreamingListMixin(object):
+    """Stream a list as a JSON array, one row at a time.
+
+    Clients opt in with ``?stream=true`` or with an ``Accept`` header such
+    as ``application/json; stream=true``. Rows are read from the database
+    in chunks of ``stream_chunk_size``, so memory use and the time to the
+    first byte do not depend on the number of rows.
+    """
+    stream_chunk_size = 500
+
+    def wants_stream(self, request):
+        """Return True when the client asked for a streamed list."""
+        if request.query_params.get('stream') in ('1', 'true'):
+            return True
+        accept = request.META.get('HTTP_ACCEPT', '').replace(' ', '')
+        return 'stream=true' in accept
+
+    def list(self, request, *args, **kwargs):
+        if not self.wants_stream(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_queryset(queryset),
+            content_type='application/json'
+        )
+
+    def stream_queryset(self, queryset):
+        """Yield the JSON array of a queryset piece by piece.
+
+        ``iterator()`` ignores prefetch_related, so the prefetches are run
+        once per chunk instead.
+        """
+        serializer = self.get_serializer()
+        renderer = JSONRenderer()
+        lookups = queryset._prefetch_related_lookups
+        rows = queryset.prefetch_related(None).iterator(
+            chunk_size=self.stream_chunk_size
+        )
+
+        separator = b'['
+        while True:
+            chunk = list(islice(rows, self.stream_chunk_size))
+            if not chunk:
+                break
+            if lookups:
+                prefetch_related_objects(chunk, *lookups)
+            for instance in chunk:
+                yield separator + renderer.render(
+                    serializer.to_representation(instance)
+                )
+                separator = b','
+        yield b']' if separator == b',' else b'[]'
+
+
+class CompiledListMixin(object):
+    """Serialize lists of flat serializers with their compiled read function.
+
+    Flat serializers, see ``compiler``, are run on ``values_list()`` tuples
+    instead of model instances. Pages are bounded, so they keep going
+    through the serializer, and so do the serializers that are not flat.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        compiled = compiler.get_compiled(
+            type(serializer),
+            getattr(serializer, 'sparse_fieldset', None)
+        )
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        with profiling.phase('serialize'):
+            data = compiled.serialize(queryset)
+        return Response(data)
+
+
+class BulkCreateMixin(object):
+    """Create every row of a posted JSON array in one transaction.
+
+    The array is validated as a whole and a 400 response lists the errors
+    of each row, in order. An empty array is a 400 as well. Valid arrays go through ``perform_create`` like
+    single rows do, so the ``save()`` keyword arguments of the view apply
+    to every row.
+    """
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_bulk_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        select, prefetch = get_eager_lookups(serializer.child)
+        prefetch_related_objects(serializer.instance, *(select + prefetch))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def get_bulk_serializer(self, data):
+        """Return a list serializer inserting the rows with bulk_create."""
+        context = self.get_serializer_context()
+        return BulkCreateListSerializer(
+            child=self.get_serializer_class()(context=context),
+            data=data,
+            context=context,
+            allow_empty=False
+        )
+
+
+class ProfilingMixin(object):
+    """Time the phases of APIView.dispatch of profiled requests.
+
+    See api.profiling. The serializer and the renderer of the request are
+    timed through their to_representation() and render() methods.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with profiling.phase('view'):
+            return super().dispatch(request, *args, **kwargs)
+
+    def perform_authentication(self, request):
+        with profiling.phase('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with profiling.phase('permissions'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with profiling.phase('permissions'):
+            super().check_object_permissions(request, obj)
+
+    def filter_queryset(self, queryset):
+        with profiling.phase('queryset'):
+            return super().filter_queryset(queryset)
+
+    def paginate_queryset(self, queryset):
+        with profiling.phase('queryset'):
+            return super().paginate_queryset(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if profiling.get_profile() is not None:
+            serializer.to_representation = profiling.timed(
+                'serialize',
+                serializer.to_representation
+            )
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request,
+            response,
+            *args,
+            **kwargs
+        )
+        renderer = getattr(response, 'accepted_renderer', None)
+        if renderer is not None and profiling.get_profile() is not None:
+            renderer.render = profiling.timed('render', renderer.render)
+        return response
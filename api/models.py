@@ -1,8 +1,19 @@
+from collections import OrderedDict
+
 from rest_framework.authtoken.models import Token
-from django.db.models.signals import post_save
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
 from django.contrib.auth.models import User
 from django.dispatch import receiver
-from django.db import models
+from django.db import IntegrityError, models, transaction
+
+from .signals import bulk_created, reordered
 
 # MENU MODELS
 class SubMenuItem(models.Model):
@@ -47,6 +58,10 @@ class SubMenuItem(models.Model):
 
     class Meta:
         ordering = ["order"]
+        indexes = [
+            models.Index(fields=['owner', 'order', 'id']),
+            models.Index(fields=['owner', 'id']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -87,11 +102,34 @@ class MenuItem(models.Model):
         auto_now=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'order', 'id']),
+            models.Index(fields=['owner', 'id']),
+        ]
+
     def __str__(self):
         """Return readable representation of the model instance."""
         return "{}".format(self.title)
 
 
+class MenuQuerySet(models.QuerySet):
+    """This class represents the Menu queryset."""
+
+    def with_tree(self):
+        """Load every menu with its items and sub items in three queries."""
+        return self.select_related('owner').prefetch_related(
+            models.Prefetch(
+                'menu_items',
+                queryset=MenuItem.objects.all()
+            ),
+            models.Prefetch(
+                'menu_items__sub_menu_items',
+                queryset=SubMenuItem.objects.order_by('order')
+            ),
+        )
+
+
 class Menu(models.Model):
     """This class represents the Menu model."""
     owner = models.ForeignKey(
@@ -115,6 +153,13 @@ class Menu(models.Model):
         auto_now=True
     )
 
+    objects = MenuQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'id']),
+        ]
+
     def __str__(self):
         """Return readable representation of the model instance."""
         return "{}".format(self.name)
@@ -167,6 +212,12 @@ class SkillChart(models.Model):
         blank=False,
         default=0
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -187,11 +238,23 @@ class SkillCategory(models.Model):
     )
     url = models.CharField(
         blank=True,
-        max_length=100
+        max_length=100,
+        db_index=True
     )
     message = models.TextField(
         blank=True
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'id']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -256,6 +319,24 @@ class Skill(models.Model):
     preferred = models.BooleanField(
         default=False
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'order', 'id']),
+            models.Index(fields=['owner', 'name', 'id']),
+            models.Index(fields=['owner', 'id']),
+            GinIndex(fields=['search_vector']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -297,6 +378,18 @@ class Experience(models.Model):
         blank=False,
         max_length=255
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'order', 'id']),
+            models.Index(fields=['owner', 'id']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -317,8 +410,20 @@ class ProgramCategory(models.Model):
     )
     url = models.CharField(
         blank=False,
-        max_length=255
+        max_length=255,
+        db_index=True
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True
     )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'id']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -354,6 +459,22 @@ class Program(models.Model):
         blank=False,
         max_length=255
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'id']),
+            GinIndex(fields=['search_vector']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -386,6 +507,18 @@ class Education(models.Model):
     website = models.URLField(
         blank=False
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'order', 'id']),
+            models.Index(fields=['owner', 'id']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -424,6 +557,18 @@ class Course(models.Model):
     website = models.URLField(
         blank=False
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'order', 'id']),
+            models.Index(fields=['owner', 'id']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -459,12 +604,81 @@ class Testimony(models.Model):
     linkedin = models.URLField(
         blank=False
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'order', 'id']),
+            models.Index(fields=['owner', 'id']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
         return "{} - {}".format(self.person, self.job)
 
 
+def parse_tags(value):
+    """Return the normalized, unique tag names of a comma separated string."""
+    names = (name.strip().lower() for name in value.split(','))
+    return list(OrderedDict.fromkeys(name for name in names if name))
+
+
+class TagQuerySet(models.QuerySet):
+    """This class represents the Tag queryset."""
+
+    def with_counts(self, case_studies=None):
+        """Annotate every tag with the number of its case studies.
+
+        Only the case studies of the given queryset are counted when one is
+        passed. Tags without case studies are left out.
+        """
+        tags = self
+        if case_studies is not None:
+            tags = tags.filter(case_studies__in=case_studies.values('pk'))
+        return tags.annotate(
+            count=models.Count('case_studies')
+        ).filter(count__gt=0).order_by('-count', 'name')
+
+
+class Tag(models.Model):
+    """This class represents the Tag model of the case studies."""
+    name = models.CharField(
+        blank=False,
+        max_length=100,
+        unique=True
+    )
+
+    objects = TagQuerySet.as_manager()
+
+    def __str__(self):
+        """Return readable representation of the model instance."""
+        return "{}".format(self.name)
+
+
+class CaseStudyQuerySet(models.QuerySet):
+    """This class represents the CaseStudy queryset."""
+
+    def tagged(self, names, match_all=False):
+        """Keep the case studies carrying any of the given tags.
+
+        With match_all only the case studies carrying every tag are kept.
+        Either way the tags are matched in a single subquery on the indexed
+        tag table.
+        """
+        names = parse_tags(','.join(names))
+        rows = CaseStudy.tag_set.through.objects.filter(tag__name__in=names)
+        if match_all:
+            rows = rows.values('casestudy').annotate(
+                tag_count=models.Count('tag')
+            ).filter(tag_count=len(names))
+        return self.filter(pk__in=rows.values('casestudy'))
+
+
 class CaseStudy(models.Model):
     """This class represents the CaseStudy model."""
     order = models.IntegerField(
@@ -500,14 +714,91 @@ class CaseStudy(models.Model):
         blank=True,
         max_length=255
     )
+    tag_set = models.ManyToManyField(
+        Tag,
+        related_name='case_studies',
+        blank=True
+    )
     coming_soon = models.BooleanField(
         default=False
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
+
+    objects = CaseStudyQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'order', 'id']),
+            models.Index(fields=['owner', 'id']),
+            GinIndex(fields=['search_vector']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
         return "{}".format(self.title)
 
+    def sync_tags(self):
+        """Link the case study to the tags listed in its tags string."""
+        sync_tags([self])
+
+
+def sync_tags(case_studies):
+    """Link many case studies to the tags listed in their tags strings.
+
+    The missing tags are inserted with one bulk_create and the links are
+    diffed against the through table, so the number of queries does not
+    grow with the number of case studies.
+    """
+    wanted = {
+        case_study.pk: parse_tags(case_study.tags)
+        for case_study in case_studies
+    }
+    names = set().union(*wanted.values())
+    tags = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = [Tag(name=name) for name in sorted(names - set(tags))]
+    if missing:
+        try:
+            with transaction.atomic():
+                Tag.objects.bulk_create(missing)
+        except IntegrityError:
+            # Another request created some of the tags in the meantime.
+            for tag in missing:
+                Tag.objects.get_or_create(name=tag.name)
+        tags.update(
+            Tag.objects.filter(
+                name__in=[tag.name for tag in missing]
+            ).values_list('name', 'id')
+        )
+
+    through = CaseStudy.tag_set.through
+    links = set(
+        (pk, tags[name]) for pk, names in wanted.items() for name in names
+    )
+    current = through.objects.filter(casestudy_id__in=wanted)
+    stale = []
+    for link_id, pk, tag_id in current.values_list(
+            'id', 'casestudy_id', 'tag_id'):
+        if (pk, tag_id) in links:
+            links.discard((pk, tag_id))
+        else:
+            stale.append(link_id)
+    if stale:
+        through.objects.filter(id__in=stale).delete()
+    if links:
+        through.objects.bulk_create([
+            through(casestudy_id=pk, tag_id=tag_id)
+            for pk, tag_id in sorted(links)
+        ])
+
 
 # Resource Models
 class ResourceCategory(models.Model):
@@ -523,8 +814,20 @@ class ResourceCategory(models.Model):
     )
     url = models.CharField(
         blank=False,
-        max_length=255
+        max_length=255,
+        db_index=True
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'id']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -557,6 +860,22 @@ class Resource(models.Model):
     link = models.URLField(
         blank=False
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True
+    )
+    modified_at = models.DateTimeField(
+        auto_now=True
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'id']),
+            GinIndex(fields=['search_vector']),
+        ]
 
     def __str__(self):
         """Return readable representation of the model instance."""
@@ -568,3 +887,121 @@ class Resource(models.Model):
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+# This receiver drops cached tokens once they are deleted.
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance=None, **kwargs):
+    from .authentication import invalidate_token
+    invalidate_token(instance.key)
+
+
+# This receiver drops cached tokens of a user once the user changes, so a
+# deactivated user is rejected on the next request.
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance=None, created=False, **kwargs):
+    if not created:
+        from .authentication import invalidate_token
+        for key in Token.objects.filter(user=instance).values_list(
+            'key', flat=True
+        ):
+            invalidate_token(key)
+
+
+# This receiver drops verified basic auth credentials once a user changes,
+# so a new password or a deactivation takes effect on the next request.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_credentials(sender, instance=None, **kwargs):
+    from .authentication import invalidate_credentials
+    invalidate_credentials(instance.username)
+
+
+# This receiver drops the menu snapshots of an owner whenever their menu
+# tree changes, or their username shown in it.
+@receiver(post_save, sender=Menu)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_save, sender=SubMenuItem)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=Menu)
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_delete, sender=SubMenuItem)
+@receiver(bulk_created, sender=Menu)
+@receiver(bulk_created, sender=MenuItem)
+@receiver(bulk_created, sender=SubMenuItem)
+@receiver(reordered, sender=MenuItem)
+@receiver(reordered, sender=SubMenuItem)
+@receiver(m2m_changed, sender=Menu.menu_items.through)
+@receiver(m2m_changed, sender=MenuItem.sub_menu_items.through)
+def invalidate_menu_snapshots(sender, instance=None, instances=None,
+                              owner_id=None, action='post_save',
+                              update_fields=None, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if sender is User:
+        if update_fields and set(update_fields) <= {'last_login'}:
+            return
+        owner_ids = [instance.pk]
+    elif owner_id is not None:
+        owner_ids = [owner_id]
+    else:
+        owner_ids = [obj.owner_id for obj in instances or [instance]]
+    from . import snapshots
+    snapshots.invalidate(*owner_ids)
+
+
+# This receiver bumps the data version of the owners of changed rows, which
+# the conditional GET validators are derived from. The owners of rows
+# without one are looked up before a delete, while the rows referring to
+# them still exist.
+@receiver(post_save)
+@receiver(pre_delete)
+@receiver(post_delete)
+@receiver(m2m_changed)
+@receiver(bulk_created)
+@receiver(reordered)
+def invalidate_versions(sender, signal=None, instance=None, instances=None,
+                        owner_id=None, action='post_save',
+                        update_fields=None, **kwargs):
+    if sender._meta.app_label != 'api' and sender is not User:
+        return
+    if not action.startswith('post_'):
+        return
+    from . import versions
+    model = type(instance) if signal is m2m_changed else sender
+    owned = model is User or versions.has_owner(model)
+    if signal is (post_delete if not owned else pre_delete):
+        return
+    if model is User:
+        if update_fields and set(update_fields) <= {'last_login'}:
+            return
+        owner_ids = [instance.pk]
+    elif owner_id is not None:
+        owner_ids = [owner_id]
+    else:
+        owner_ids = versions.get_owner_ids(model, instances or [instance])
+    versions.invalidate(*owner_ids)
+
+
+# This receiver refreshes the full-text search column of saved rows.
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=Program)
+@receiver(post_save, sender=Resource)
+@receiver(post_save, sender=CaseStudy)
+@receiver(bulk_created, sender=Skill)
+@receiver(bulk_created, sender=Program)
+@receiver(bulk_created, sender=Resource)
+@receiver(bulk_created, sender=CaseStudy)
+def update_search_vector(sender, instance=None, instances=None, **kwargs):
+    from . import search
+    if instances is None:
+        instances = [instance]
+    search.update_search_vectors(sender, [obj.pk for obj in instances])
+
+
+# This receiver keeps the tag table in step with the tags string of saved
+# case studies.
+@receiver(post_save, sender=CaseStudy)
+@receiver(bulk_created, sender=CaseStudy)
+def sync_case_study_tags(sender, instance=None, instances=None, **kwargs):
+    sync_tags(instances or [instance])
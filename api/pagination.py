@@ -0,0 +1,139 @@
+import json
+from base64 import b64decode, b64encode
+from functools import reduce
+from operator import or_
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination that seeks on the natural ordering of each view.
+
+    The ordering of a view always ends on the primary key, so it is
+    unique, and the cursor holds the values of every ordering column of
+    the last row sent. Every page is fetched with a ``WHERE (<ordering>) >
+    (<cursor>)`` query, so its cost does not grow with the depth of the
+    page. Pagination is opt in: a view turns it on by setting
+    ``page_size`` and a client by sending ``?page_size=``. Without either
+    the full list is returned as before.
+    """
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = getattr(view, 'page_size', self.page_size)
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        position, self.reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(_flip(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(_seek(ordering, position))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        if self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering of the view, ending on the primary key."""
+        ordering = getattr(view, 'ordering', self.ordering)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('id',)
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        """Return the position and the direction of the requested page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            cursor = json.loads(b64decode(encoded.encode('ascii')).decode())
+            position, reverse = cursor['p'], bool(cursor['r'])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or (
+                len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, row, reverse):
+        """Return the link of the page after or before row."""
+        position = [
+            getattr(row, field.lstrip('-')) for field in self.ordering
+        ]
+        encoded = b64encode(json.dumps(
+            {'p': position, 'r': int(reverse)},
+            cls=DjangoJSONEncoder
+        ).encode()).decode('ascii')
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            encoded
+        )
+
+
+def _flip(field):
+    """Return the ordering field sorting the other way."""
+    return field[1:] if field.startswith('-') else '-' + field
+
+
+def _seek(ordering, position):
+    """Return the filter of the rows after position in ordering.
+
+    The row comparison is spelled out as ``a > x OR (a = x AND b > y)``,
+    and the leading ``a >= x`` lets the database range scan an index on
+    the ordering.
+    """
+    conditions = []
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = '{}__{}'.format(name, 'lt' if field.startswith('-') else 'gt')
+        equal = {
+            previous.lstrip('-'): value
+            for previous, value in zip(ordering[:i], position)
+        }
+        conditions.append(Q(**equal) & Q(**{lookup: position[i]}))
+    first = ordering[0]
+    bound = '{}__{}'.format(
+        first.lstrip('-'),
+        'lte' if first.startswith('-') else 'gte'
+    )
+    return Q(**{bound: position[0]}) & reduce(or_, conditions)
@@ -0,0 +1,87 @@
+import copy
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import QueryDict
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from . import metrics
+from . import versions
+
+RESUME_TIMEOUT = getattr(settings, 'RESUME_TIMEOUT', 60 * 60 * 24)
+
+
+def _key(version, request, sections):
+    """Return the cache key of a document for the given data version.
+
+    Every document key embeds the data version of its owner, see
+    api.versions, so any change to the owner's rows drops the documents
+    of that owner only.
+    """
+    digest = hashlib.md5(repr((
+        request.user.pk,
+        request.accepted_media_type,
+        sections,
+    )).encode()).hexdigest()
+    return 'resume:{}:{}'.format(version, digest)
+
+
+def _without_params(request):
+    """Return a copy of a request with an empty query string.
+
+    The copy keeps the user and the negotiated renderer of the request.
+    """
+    http_request = copy.copy(request._request)
+    http_request.GET = QueryDict()
+    http_request.META = dict(http_request.META, QUERY_STRING='')
+    clean = Request(
+        http_request,
+        parsers=request.parsers,
+        authenticators=request.authenticators,
+        negotiator=request.negotiator,
+        parser_context=request.parser_context
+    )
+    clean.user = request.user
+    clean.auth = request.auth
+    clean.accepted_renderer = request.accepted_renderer
+    clean.accepted_media_type = request.accepted_media_type
+    return clean
+
+
+def build(request, sections):
+    """Render the list of every section view into one JSON document.
+
+    sections maps the name of each section to its list view class. Every
+    view runs its own queryset, filters and serializer, so a section has
+    exactly the content of the unfiltered list endpoint. The sections
+    are built from a request without the query string of the resume
+    request, so parameters such as ``?tag=``, ``?fields=`` or
+    ``?cursor=`` never reach them.
+    """
+    request = _without_params(request)
+    data = {}
+    for name, view_class in sections:
+        view = view_class(
+            request=request,
+            args=(),
+            kwargs={},
+            format_kwarg=None,
+            sparse_fieldsets=False
+        )
+        queryset = view.filter_queryset(view.get_queryset())
+        data[name] = view.get_serializer(queryset, many=True).data
+    return JSONRenderer().render(data)
+
+
+def get_document(request, sections):
+    """Return the version and rendered JSON bytes of a document."""
+    version = versions.get_version(request.user.pk)[0]
+    key = _key(version, request, sections)
+    content = cache.get(key)
+    metrics.count_cache('resume', content is not None)
+    if content is None:
+        content = build(request, sections)
+        cache.set(key, content, RESUME_TIMEOUT)
+    return version, content
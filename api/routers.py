@@ -0,0 +1,91 @@
+"""Database router sending reads to the replicas and writes to the primary.
+
+Replicas are listed in ``settings.DATABASE_REPLICAS``. A replica lagging
+more than ``REPLICA_MAX_LAG`` seconds behind the primary is skipped, and
+reads fall back to the primary when every replica lags. Reads stick to the
+primary once the current thread wrote, inside transactions, and for the
+requests ``ReplicaStickinessMiddleware`` pins after a client wrote.
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# Seconds a replica is behind the primary. Zero when it replayed every
+# change it received, which also covers an idle primary.
+LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) "
+    "END"
+)
+
+_state = threading.local()
+_lags = {}
+
+
+def start_request(pinned=False):
+    """Reset the routing state of this thread for a new request."""
+    _state.pinned = pinned
+    _state.wrote = False
+
+
+def wrote():
+    """Return True when this thread wrote since its request started."""
+    return getattr(_state, 'wrote', False)
+
+
+def get_lag(alias):
+    """Return the replication lag of a replica in seconds.
+
+    The lag is measured at most once every REPLICA_LAG_CHECK_INTERVAL
+    seconds per process. A replica that cannot be reached lags forever.
+    Databases other than PostgreSQL never lag.
+    """
+    now = time.monotonic()
+    checked_at, lag = _lags.get(alias, (None, None))
+    if (checked_at is not None and
+            now - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL):
+        return lag
+
+    lag = 0.0
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = float(cursor.fetchone()[0] or 0)
+        except DatabaseError:
+            lag = float('inf')
+    _lags[alias] = (now, lag)
+    return lag
+
+
+class ReplicaRouter(object):
+    """Route reads to a replica in sync with the primary, writes to it."""
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if not replicas:
+            return None
+        if (getattr(_state, 'pinned', False) or
+                connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        in_sync = [
+            alias for alias in replicas
+            if get_lag(alias) <= settings.REPLICA_MAX_LAG
+        ]
+        return random.choice(in_sync) if in_sync else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _state.pinned = True
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
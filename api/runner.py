@@ -0,0 +1,47 @@
+"""Test runner keeping the tests away from the caches of a deployment.
+
+The default cache and METRICS_DIR are files shared by every process on
+the host. Tests and benchmarks point them at a scratch directory instead,
+so running them on a deployed box leaves the live snapshots, auth caches,
+slow query log and metrics alone.
+"""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+@contextmanager
+def scratch_storage():
+    """Point the default cache and the metric files at a temp directory."""
+    directory = tempfile.mkdtemp(prefix='jp-test-')
+    try:
+        with override_settings(
+            CACHES={
+                'default': {
+                    'BACKEND':
+                        'django.core.cache.backends.filebased.FileBasedCache',
+                    'LOCATION': os.path.join(directory, 'cache'),
+                },
+            },
+            METRICS_DIR=os.path.join(directory, 'metrics'),
+        ):
+            yield directory
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class TestRunner(DiscoverRunner):
+    """Discover runner running the suite on scratch storage."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._storage = scratch_storage()
+        self._storage.__enter__()
+
+    def teardown_test_environment(self, **kwargs):
+        self._storage.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
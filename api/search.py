@@ -0,0 +1,83 @@
+"""Full-text search over the skills, programs, resources and case studies.
+
+On PostgreSQL every searchable model keeps a ``search_vector`` tsvector
+column, refreshed by the receivers in ``models.py`` and covered by a GIN
+index. Other databases fall back to case insensitive matching, which is
+enough for development and tests.
+"""
+from functools import reduce
+from operator import add, or_
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connections, router
+from django.db.models import F, FloatField, Q, Value
+
+from . import models
+
+# The searchable columns of every model, most important first. The first
+# column is weighted A and the others B.
+SEARCH_FIELDS = {
+    models.Skill: ('name', 'why', 'last_project'),
+    models.Program: ('name', 'summary'),
+    models.Resource: ('reference', 'description'),
+    models.CaseStudy: ('title', 'subtitle', 'summary', 'tags'),
+}
+
+
+def _uses_postgresql(model):
+    """Return True when the model lives in a PostgreSQL database."""
+    return connections[router.db_for_read(model)].vendor == 'postgresql'
+
+
+def get_search_vector(model):
+    """Return the weighted SearchVector expression of a model."""
+    fields = SEARCH_FIELDS[model]
+    return reduce(add, [
+        SearchVector(
+            field,
+            weight='A' if i == 0 else 'B',
+            config=settings.SEARCH_CONFIG
+        ) for i, field in enumerate(fields)
+    ])
+
+
+def update_search_vectors(model, pks=None):
+    """Recompute the search_vector column of the given rows in one UPDATE.
+
+    Every row of the model is updated when pks is None.
+    """
+    database = router.db_for_write(model)
+    if connections[database].vendor != 'postgresql':
+        return 0
+    rows = model.objects.using(database).all()
+    if pks is not None:
+        rows = rows.filter(pk__in=pks)
+    return rows.update(search_vector=get_search_vector(model))
+
+
+def search(queryset, text):
+    """Filter a queryset to the rows matching text, best matches first.
+
+    The rows are annotated with their ``rank``.
+    """
+    model = queryset.model
+    if _uses_postgresql(model):
+        query = SearchQuery(text, config=settings.SEARCH_CONFIG)
+        return queryset.annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).filter(search_vector=query).order_by('-rank', 'id')
+
+    terms = Q()
+    for word in text.split():
+        terms &= reduce(or_, [
+            Q(**{field + '__icontains': word})
+            for field in SEARCH_FIELDS[model]
+        ])
+    return queryset.annotate(
+        rank=Value(0.0, output_field=FloatField())
+    ).filter(terms).order_by('id')
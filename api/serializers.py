@@ -1,9 +1,197 @@
+from collections import OrderedDict
+
+from django.db import connections, router, transaction
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.utils import model_meta
+from rest_framework.validators import UniqueValidator
 
 from . import models
+from . import signals
+
+BULK_BATCH_SIZE = 1000
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """List serializer inserting all of its rows in one transaction."""
+
+    def to_internal_value(self, data):
+        """Validate the rows and reject unique values repeated among them.
+
+        The unique validators of the child only look at the database, so a
+        value posted twice in the same array is caught here instead.
+        """
+        rows = super().to_internal_value(data)
+        errors = [{} for row in rows]
+        for name, field in self.child.fields.items():
+            if field.read_only or not any(
+                isinstance(validator, UniqueValidator)
+                for validator in field.validators
+            ):
+                continue
+            seen = set()
+            for row, error in zip(rows, errors):
+                value = row.get(field.source)
+                if value in seen:
+                    error[name] = ['This value is repeated in the request.']
+                seen.add(value)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return rows
+
+    def create(self, validated_data):
+        """Insert the rows with bulk_create and link their relations.
+
+        Backends that do not set primary keys on bulk inserts save the rows
+        one by one instead, still inside a single transaction. bulk_created
+        is only sent for bulk inserts, since saved rows already sent
+        post_save.
+        """
+        model = self.child.Meta.model
+        relations = model_meta.get_field_info(model).relations
+        objs, links = [], []
+        for attrs in validated_data:
+            links.append({
+                name: attrs.pop(name) for name, relation in relations.items()
+                if relation.to_many and name in attrs
+            })
+            objs.append(model(**attrs))
+
+        database = router.db_for_write(model)
+        bulk = connections[database].features.can_return_ids_from_bulk_insert
+        with transaction.atomic(using=database):
+            if bulk:
+                model.objects.using(database).bulk_create(
+                    objs,
+                    batch_size=BULK_BATCH_SIZE
+                )
+            else:
+                for obj in objs:
+                    obj.save(using=database)
+
+            for name in set().union(*links):
+                field = model._meta.get_field(name)
+                through = field.remote_field.through
+                source = through._meta.get_field(field.m2m_field_name())
+                target = through._meta.get_field(
+                    field.m2m_reverse_field_name()
+                )
+                through.objects.using(database).bulk_create([
+                    through(**{
+                        source.attname: obj.pk,
+                        target.attname: related.pk,
+                    })
+                    for obj, values in zip(objs, links)
+                    for related in values.get(name, ())
+                ], batch_size=BULK_BATCH_SIZE)
+
+        if bulk:
+            signals.bulk_created.send(sender=model, instances=objs)
+        return objs
+
+
+class ReorderListSerializer(serializers.ListSerializer):
+    """List serializer of a reorder request, listing every row once."""
+
+    def to_internal_value(self, data):
+        """Validate the rows and reject ids repeated among them.
+
+        Otherwise the last order given for a row would silently win.
+        """
+        rows = super().to_internal_value(data)
+        errors = [{} for row in rows]
+        seen = set()
+        for row, error in zip(rows, errors):
+            if row['id'] in seen:
+                error['id'] = ['This value is repeated in the request.']
+            seen.add(row['id'])
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return rows
+
+
+class ReorderSerializer(serializers.Serializer):
+    """Serializer to map one row of a reorder request."""
+    id = serializers.IntegerField()
+    order = serializers.IntegerField()
+
+    class Meta:
+        list_serializer_class = ReorderListSerializer
+
+
+def _parse_field_names(value):
+    """Return the sorted names of a comma separated list, or None if empty."""
+    names = set(name.strip() for name in (value or '').split(','))
+    names.discard('')
+    return tuple(sorted(names)) or None
+
+
+def get_sparse_fieldset(request):
+    """Return the ``(fields, exclude)`` names asked for by a request.
+
+    Either name list is None when its parameter is missing, and the whole
+    fieldset is None when both are. Only safe requests are projected, so
+    writes always see every field.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fieldset = (
+        _parse_field_names(request.query_params.get('fields')),
+        _parse_field_names(request.query_params.get('exclude')),
+    )
+    return None if fieldset == (None, None) else fieldset
+
+
+def select_fields(fields, fieldset):
+    """Return the fields of an ordered mapping kept by a sparse fieldset.
+
+    Unknown field names raise a ValidationError.
+    """
+    only, exclude = fieldset
+    errors = {}
+    for param, names in (('fields', only), ('exclude', exclude)):
+        unknown = [name for name in names or () if name not in fields]
+        if unknown:
+            errors[param] = ['Unknown fields: {}.'.format(', '.join(unknown))]
+    if errors:
+        raise serializers.ValidationError(errors)
+    return OrderedDict(
+        (name, field) for name, field in fields.items()
+        if (only is None or name in only) and name not in (exclude or ())
+    )
+
+
+class SparseFieldsMixin(object):
+    """Keep only the fields asked for with ``?fields=`` and ``?exclude=``.
+
+    Both parameters take comma separated field names. They apply to the
+    top level serializer of safe requests to views setting
+    ``sparse_fieldsets``, the list and detail views. Nested serializers
+    and composite responses such as /search/ and /resume/ keep every
+    field.
+    """
+
+    @property
+    def sparse_fieldset(self):
+        """Return the fieldset of the request, see get_sparse_fieldset()."""
+        if not getattr(self.context.get('view'), 'sparse_fieldsets', False):
+            return None
+        top = self
+        if isinstance(self.parent, serializers.ListSerializer):
+            top = self.parent
+        if top.parent is not None:
+            return None
+        return get_sparse_fieldset(self.context.get('request'))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.sparse_fieldset
+        if fieldset is None:
+            return fields
+        return select_fields(fields, fieldset)
 
 # Menu Serializers
-class SubMenuItemSerializer(serializers.ModelSerializer):
+class SubMenuItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Menu Item Model instance into JSON format."""
 
     class Meta:
@@ -27,7 +215,7 @@ class SubMenuItemSerializer(serializers.ModelSerializer):
         )
 
 
-class MenuItemSerializer(serializers.ModelSerializer):
+class MenuItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Menu Item Model instance into JSON format."""
     sub_menu_items = SubMenuItemSerializer(many=True, read_only=True)
 
@@ -51,7 +239,7 @@ class MenuItemSerializer(serializers.ModelSerializer):
         )
 
 
-class MenuSerializer(serializers.ModelSerializer):
+class MenuSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Menu Model instance into JSON format."""
     owner = serializers.ReadOnlyField(source='owner.username')
     menu_items = MenuItemSerializer(many=True, read_only=True)
@@ -74,7 +262,7 @@ class MenuSerializer(serializers.ModelSerializer):
 
 
 # Skill serializers
-class SkillChartSerializer(serializers.ModelSerializer):
+class SkillChartSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Skill Chart Model instance into JSON format."""
 
     class Meta:
@@ -96,7 +284,7 @@ class SkillChartSerializer(serializers.ModelSerializer):
         )
 
 
-class SkillCategorySerializer(serializers.ModelSerializer):
+class SkillCategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Skill Category Model instance into JSON format."""
 
     class Meta:
@@ -110,7 +298,7 @@ class SkillCategorySerializer(serializers.ModelSerializer):
         )
 
 
-class SkillSerializer(serializers.ModelSerializer):
+class SkillSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Menu Model instance into JSON format."""
     owner = serializers.ReadOnlyField(source='owner.username')
     # category = SkillCategorySerializer(many=True, read_only=True)
@@ -139,7 +327,7 @@ class SkillSerializer(serializers.ModelSerializer):
 
 
 # Experience serializers
-class ExperienceSerializer(serializers.ModelSerializer):
+class ExperienceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Experience Model instance into JSON format."""
     owner = serializers.ReadOnlyField(source='owner.username')
 
@@ -160,7 +348,10 @@ class ExperienceSerializer(serializers.ModelSerializer):
 
 
 # Program serializers
-class ProgramCategorySerializer(serializers.ModelSerializer):
+class ProgramCategorySerializer(
+    SparseFieldsMixin,
+    serializers.ModelSerializer
+):
     """Serializer to map the Skill Chart Model instance into JSON format."""
 
     class Meta:
@@ -174,7 +365,7 @@ class ProgramCategorySerializer(serializers.ModelSerializer):
         )
 
 
-class ProgramSerializer(serializers.ModelSerializer):
+class ProgramSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Menu Model instance into JSON format."""
     # program_category = ProgramCategorySerializer(read_only=True)
     owner = serializers.ReadOnlyField(source='owner.username')
@@ -194,7 +385,7 @@ class ProgramSerializer(serializers.ModelSerializer):
 
 
 # Experience serializers
-class EducationSerializer(serializers.ModelSerializer):
+class EducationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Education Model instance into JSON format."""
     owner = serializers.ReadOnlyField(source='owner.username')
 
@@ -213,7 +404,7 @@ class EducationSerializer(serializers.ModelSerializer):
 
 
 # Course serializers
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Course Model instance into JSON format."""
     owner = serializers.ReadOnlyField(source='owner.username')
 
@@ -234,7 +425,7 @@ class CourseSerializer(serializers.ModelSerializer):
 
 
 # Testimony serializers
-class TestimonySerializer(serializers.ModelSerializer):
+class TestimonySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Testimony Model instance into JSON format."""
     owner = serializers.ReadOnlyField(source='owner.username')
 
@@ -254,7 +445,7 @@ class TestimonySerializer(serializers.ModelSerializer):
 
 
 # Case Study serializers
-class CaseStudySerializer(serializers.ModelSerializer):
+class CaseStudySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the CaseStudy Model instance into JSON format."""
     owner = serializers.ReadOnlyField(source='owner.username')
 
@@ -275,8 +466,24 @@ class CaseStudySerializer(serializers.ModelSerializer):
         )
 
 
+class TagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer to map the Tag Model instance and its count into JSON."""
+    count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        """Meta class to map serializer's fields with the model fields."""
+        model = models.Tag
+        fields = (
+            'name',
+            'count',
+        )
+
+
 # Resource serializers
-class ResourceCategorySerializer(serializers.ModelSerializer):
+class ResourceCategorySerializer(
+    SparseFieldsMixin,
+    serializers.ModelSerializer
+):
     """Serializer to map the Resource Category Model instance into JSON format."""
 
     class Meta:
@@ -290,7 +497,7 @@ class ResourceCategorySerializer(serializers.ModelSerializer):
         )
 
 
-class ResourceSerializer(serializers.ModelSerializer):
+class ResourceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer to map the Resource Model instance into JSON format."""
     resource_category = ResourceCategorySerializer(read_only=True)
     owner = serializers.ReadOnlyField(source='owner.username')
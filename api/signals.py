@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent after a list of rows was inserted with bulk_create, which sends no
+# post_save signals of its own.
+bulk_created = Signal(providing_args=['instances'])
+
+# Sent after the order column of a set of rows of one owner was rewritten
+# with a single UPDATE, which sends no post_save signals either.
+reordered = Signal(providing_args=['pks', 'owner_id'])
@@ -0,0 +1,183 @@
+"""Log of the SQL statements slower than SLOW_QUERY_THRESHOLD_MS.
+
+``SlowQueryMiddleware`` wraps the database connections of every request
+with a Recorder. A statement over the threshold is kept with its SQL,
+parameters and duration, the view and the serializer field running it,
+and the project frames of the Python stack. The parameters are kept as
+their number and types, since they may hold passwords, tokens or
+personal data, unless SLOW_QUERY_LOG_PARAMS opts in to their values.
+With SLOW_QUERY_EXPLAIN on PostgreSQL, ``EXPLAIN (ANALYZE, BUFFERS)`` of
+slow SELECT statements is kept too. ANALYZE runs the statement a second
+time, so it stays off by default.
+
+Records go to a ring buffer of SLOW_QUERY_LOG_SIZE slots in the default
+cache, which every worker shares. The admin page at
+``/admin/slow-queries/`` and the ``slow_queries`` command read it.
+"""
+import sys
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.views import View
+from rest_framework.serializers import Serializer
+
+# Cache keys of the ring buffer. The counter is the number of records ever
+# written, so the next one goes to the slot of counter modulo the size.
+COUNTER_KEY = 'slowqueries:counter'
+SLOT_KEY = 'slowqueries:slot:{}'
+
+# Frames of these files are left out of the recorded stacks.
+_SKIPPED_FILES = (__file__,)
+
+
+def get_threshold():
+    """Return the threshold in seconds, or None when logging is off."""
+    threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 0)
+    return threshold / 1000 if threshold > 0 else None
+
+
+def get_size():
+    """Return the number of records kept by the ring buffer."""
+    return getattr(settings, 'SLOW_QUERY_LOG_SIZE', 100)
+
+
+def _describe_params(params, many):
+    """Return the parameters of a statement as the log keeps them.
+
+    Without SLOW_QUERY_LOG_PARAMS only their number and types are kept,
+    e.g. ``3 params: int, str, datetime``. An executemany() is described
+    by its number of rows and the parameters of its first row.
+    """
+    if getattr(settings, 'SLOW_QUERY_LOG_PARAMS', False):
+        return repr(params)[:1000]
+    if params is None:
+        return None
+    if many:
+        params = list(params)
+        first = _describe_params(params[0], False) if params else None
+        return '{} rows of {}'.format(len(params), first)
+    if isinstance(params, dict):
+        params = params.values()
+    types = [type(param).__name__ for param in params]
+    return '{} params: {}'.format(len(types), ', '.join(types))
+
+
+def _attribute(frame):
+    """Return the view, the serializer field and the project stack.
+
+    The view is the innermost method of a view instance, and the field the
+    innermost field a serializer was reading when the statement ran.
+    """
+    view = field = None
+    stack = []
+    depth = getattr(settings, 'SLOW_QUERY_STACK_DEPTH', 10)
+    while frame is not None:
+        code = frame.f_code
+        # type() rather than isinstance(), which would evaluate lazy
+        # objects such as request.user and run more queries.
+        owner = type(frame.f_locals.get('self'))
+        if view is None and issubclass(owner, View):
+            view = '{}.{}'.format(owner.__name__, code.co_name)
+        if (field is None and code.co_name == 'to_representation' and
+                issubclass(owner, Serializer) and
+                'field' in frame.f_locals):
+            field = '{}.{}'.format(
+                owner.__name__,
+                frame.f_locals['field'].field_name
+            )
+        if (len(stack) < depth and
+                code.co_filename.startswith(settings.BASE_DIR) and
+                'site-packages' not in code.co_filename and
+                code.co_filename not in _SKIPPED_FILES):
+            stack.append('{}:{} in {}'.format(
+                code.co_filename[len(settings.BASE_DIR) + 1:],
+                frame.f_lineno,
+                code.co_name
+            ))
+        frame = frame.f_back
+    return view, field, stack
+
+
+def _explain(context, sql, params):
+    """Return the EXPLAIN (ANALYZE, BUFFERS) output of a statement.
+
+    It runs on a new raw DB-API cursor, so the rows of the statement are
+    left to its caller and the EXPLAIN is not recorded again. Inside a
+    transaction, a savepoint keeps a failing EXPLAIN from aborting it.
+    """
+    connection = context['connection']
+    if (not getattr(settings, 'SLOW_QUERY_EXPLAIN', False) or
+            connection.vendor != 'postgresql' or
+            not sql.lstrip().upper().startswith('SELECT')):
+        return None
+    savepoint = connection.in_atomic_block
+    with connection.connection.cursor() as cursor:
+        if savepoint:
+            cursor.execute('SAVEPOINT slowqueries_explain')
+        try:
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS) ' + sql, params)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        except Exception as error:
+            if savepoint:
+                cursor.execute('ROLLBACK TO SAVEPOINT slowqueries_explain')
+            return 'EXPLAIN failed: {}'.format(error)
+        if savepoint:
+            cursor.execute('RELEASE SAVEPOINT slowqueries_explain')
+    return plan
+
+
+def add(entry):
+    """Write a record to the next slot of the ring buffer."""
+    cache.add(COUNTER_KEY, 0, None)
+    try:
+        index = cache.incr(COUNTER_KEY)
+    except ValueError:
+        cache.set(COUNTER_KEY, 1, None)
+        index = 1
+    entry['id'] = index
+    cache.set(SLOT_KEY.format(index % get_size()), entry, None)
+
+
+def get_records():
+    """Return the records of the ring buffer, the newest first."""
+    keys = [SLOT_KEY.format(slot) for slot in range(get_size())]
+    records = cache.get_many(keys).values()
+    return sorted(records, key=lambda entry: entry['id'], reverse=True)
+
+
+def clear():
+    """Empty the ring buffer."""
+    cache.delete_many(
+        [COUNTER_KEY] +
+        [SLOT_KEY.format(slot) for slot in range(get_size())]
+    )
+
+
+class Recorder(object):
+    """Database execute wrapper recording the slow statements."""
+
+    def __init__(self, threshold, request=None):
+        self.threshold = threshold
+        self.path = request.path if request is not None else None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration >= self.threshold:
+            view, field, stack = _attribute(sys._getframe(1))
+            add({
+                'time': timezone.now().isoformat(),
+                'duration_ms': round(duration * 1000, 3),
+                'sql': sql,
+                'params': _describe_params(params, many),
+                'many': many,
+                'path': self.path,
+                'view': view,
+                'field': field,
+                'stack': stack,
+                'explain': None if many else _explain(context, sql, params),
+            })
+        return result
@@ -0,0 +1,104 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from . import metrics
+from . import models
+from . import serializers
+
+# Every snapshot key embeds the current version of its owner, so bumping
+# that version is enough to invalidate all the snapshots of the owner.
+VERSION_KEY = 'menus:version:{}'
+SNAPSHOT_TIMEOUT = getattr(settings, 'MENU_SNAPSHOT_TIMEOUT', 60 * 60 * 24)
+
+
+def _key(version, name):
+    """Return the cache key of a snapshot for the given version."""
+    return 'menus:{}:{}'.format(version, name)
+
+
+def _render(data):
+    """Render serialized data the same way the JSON renderer would."""
+    return JSONRenderer().render(data)
+
+
+def _build(owner_id, version, pk=None):
+    """Render the menu snapshots of an owner and store them in the cache.
+
+    The menu list and every menu are rendered, or only the menu pk when it
+    is given. Snapshots are built lazily on read, so a version only ever
+    holds data read after it was set.
+    """
+    menus = models.Menu.objects.with_tree().filter(owner_id=owner_id)
+    if pk is not None:
+        menus = menus.filter(pk=pk)
+    menus = list(menus)
+    data = serializers.MenuSerializer(menus, many=True).data
+
+    entries = {
+        _key(version, menu.pk): _render(item)
+        for menu, item in zip(menus, data)
+    }
+    if pk is None:
+        entries[_key(version, 'list')] = _render(data)
+    cache.set_many(entries, SNAPSHOT_TIMEOUT)
+    return entries
+
+
+def get_version(owner_id):
+    """Return the snapshot version of an owner, creating one if needed."""
+    key = VERSION_KEY.format(owner_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_menu_list(owner_id):
+    """Return the rendered JSON bytes of the menu list of an owner."""
+    version = get_version(owner_id)
+    key = _key(version, 'list')
+    content = cache.get(key)
+    metrics.count_cache('menus', content is not None)
+    if content is None:
+        content = _build(owner_id, version)[key]
+    return content
+
+
+def get_menu(owner_id, pk):
+    """Return the rendered JSON bytes of a menu of an owner.
+
+    Returns None when the owner has no such menu.
+    """
+    version = get_version(owner_id)
+    key = _key(version, pk)
+    content = cache.get(key)
+    metrics.count_cache('menus', content is not None)
+    if content is None:
+        content = _build(owner_id, version, pk=pk).get(key)
+    return content
+
+
+def _bump(owner_ids):
+    """Give each owner a new snapshot version."""
+    cache.set_many(
+        {VERSION_KEY.format(owner_id): uuid.uuid4().hex
+         for owner_id in owner_ids},
+        None
+    )
+
+
+def invalidate(*owner_ids):
+    """Drop the snapshots of the given owners.
+
+    The versions are bumped at once and again when the transaction
+    commits, so a snapshot read before the commit is never served after
+    it. Nothing is rebuilt here, the next read renders the snapshots.
+    """
+    owner_ids = set(owner_ids)
+    _bump(owner_ids)
+    transaction.on_commit(lambda: _bump(owner_ids))
@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .. import factories
+
+
+class SeededTestCase(TestCase):
+    """Base test case with a seeded portfolio and an authenticated client.
+
+    ``self.user`` owns ``seed_size`` rows of every model, returned by
+    factories.seed() in ``self.rows``, and ``self.client`` is
+    authenticated as that user.
+    """
+    seed_size = 3
+
+    def setUp(self):
+        """Define the test client and a few rows of every model."""
+        self.user = User.objects.create(username="jpc")
+        self.rows = factories.seed(self.user, self.seed_size)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
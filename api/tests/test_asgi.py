@@ -0,0 +1,101 @@
+import asyncio
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import SimpleTestCase
+
+from ..asgi import ASGIHandler
+
+
+class ASGIHandlerTestCase(SimpleTestCase):
+    """Test suite for the ASGI adapter."""
+
+    def setUp(self):
+        """Define the adapter and an event loop to run it on."""
+        self.handler = ASGIHandler(WSGIHandler(), threads=2)
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+
+    def call(self, scope, messages):
+        """Run the adapter on a scope and return the messages it sent."""
+        received, sent = list(messages), []
+
+        async def receive():
+            return received.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        self.loop.run_until_complete(self.handler(scope, receive, send))
+        return sent
+
+
+    def test_request_is_answered_by_django(self):
+        """Test a request goes through Django and back."""
+        sent = self.call({
+            'type': 'http',
+            'method': 'GET',
+            'path': '/skills/',
+            'query_string': b'',
+            'headers': [
+                (b'host', b'testserver'),
+                (b'accept', b'application/json'),
+            ],
+        }, [{'type': 'http.request', 'body': b''}])
+        self.assertEqual(sent[0]['type'], 'http.response.start')
+        self.assertEqual(sent[0]['status'], 401)
+        self.assertIn(
+            (b'content-type', b'application/json'),
+            sent[0]['headers']
+        )
+        body = b''.join(message.get('body', b'') for message in sent[1:])
+        self.assertIn(b'detail', body)
+        self.assertFalse(sent[-1].get('more_body', False))
+
+
+    def test_disconnected_clients_are_not_answered(self):
+        """Test nothing runs for a client gone before sending its body."""
+        sent = self.call({
+            'type': 'http',
+            'method': 'POST',
+            'path': '/skills/',
+            'headers': [],
+        }, [
+            {'type': 'http.request', 'body': b'[', 'more_body': True},
+            {'type': 'http.disconnect'},
+        ])
+        self.assertEqual(sent, [])
+
+
+    def test_environ_carries_the_request(self):
+        """Test the WSGI environ holds the path, body and headers."""
+        environ = self.handler.get_environ({
+            'type': 'http',
+            'method': 'POST',
+            'path': '/skills/é/',
+            'query_string': b'stream=true',
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'x-tag', b'a'),
+                (b'x-tag', b'b'),
+            ],
+            'client': ('10.0.0.1', 1234),
+        }, b'[]')
+        self.assertEqual(environ['PATH_INFO'], '/skills/\xc3\xa9/')
+        self.assertEqual(environ['QUERY_STRING'], 'stream=true')
+        self.assertEqual(environ['CONTENT_TYPE'], 'application/json')
+        self.assertEqual(environ['HTTP_X_TAG'], 'a,b')
+        self.assertEqual(environ['REMOTE_ADDR'], '10.0.0.1')
+        self.assertEqual(environ['wsgi.input'].read(), b'[]')
+
+
+    def test_lifespan_is_acknowledged(self):
+        """Test the server startup and shutdown are acknowledged."""
+        sent = self.call({'type': 'lifespan'}, [
+            {'type': 'lifespan.startup'},
+            {'type': 'lifespan.shutdown'},
+        ])
+        self.assertEqual([message['type'] for message in sent], [
+            'lifespan.startup.complete',
+            'lifespan.shutdown.complete',
+        ])
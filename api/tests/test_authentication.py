@@ -0,0 +1,223 @@
+import base64
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import exceptions, status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .. import authentication
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    """Test suite for the cached token authentication backend."""
+
+    def setUp(self):
+        """Define the backend, a user and its token."""
+        authentication.token_cache.clear()
+        authentication.generation_cache.clear()
+        self.backend = authentication.CachedTokenAuthentication()
+        self.user = User.objects.create(username="jpc")
+        self.token = Token.objects.get(user=self.user)
+        authentication.invalidate_token(self.token.key)
+
+
+    def test_token_is_resolved_from_cache(self):
+        """Test only the first lookup of a token hits the database."""
+        with self.assertNumQueries(1):
+            user, token = self.backend.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = self.backend.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token, self.token)
+
+
+    def test_shared_cache_backs_local_cache(self):
+        """Test a process without a local entry uses the shared cache."""
+        self.backend.authenticate_credentials(self.token.key)
+        authentication.token_cache.clear()
+        with self.assertNumQueries(0):
+            self.backend.authenticate_credentials(self.token.key)
+
+
+    def test_deleted_token_is_rejected(self):
+        """Test deleting a token invalidates its cached entry."""
+        key = self.token.key
+        self.backend.authenticate_credentials(key)
+        self.token.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials(key)
+
+
+    def test_local_hits_skip_the_shared_cache(self):
+        """Test a token resolved by this process does not read the cache."""
+        self.backend.authenticate_credentials(self.token.key)
+        with mock.patch.object(authentication, 'cache') as shared:
+            self.backend.authenticate_credentials(self.token.key)
+        self.assertEqual(shared.mock_calls, [])
+
+
+    def test_revocation_reaches_other_processes(self):
+        """Test a token revoked elsewhere is dropped once the TTL passes."""
+        key = self.token.key
+        self.backend.authenticate_credentials(key)
+        tokens = dict(authentication.token_cache._data)
+        generations = dict(authentication.generation_cache._data)
+        self.token.delete()
+
+        # Another process still holds the old token and generation.
+        authentication.token_cache._data.update(tokens)
+        authentication.generation_cache._data.update(generations)
+        self.backend.authenticate_credentials(key)
+
+        authentication.generation_cache.clear()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials(key)
+
+
+    def test_deactivated_user_is_rejected(self):
+        """Test deactivating a user invalidates its cached token."""
+        self.backend.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials(self.token.key)
+
+
+    def test_invalid_token_is_rejected(self):
+        """Test an unknown token fails authentication."""
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials('invalid')
+
+
+    def test_stats_count_hits_and_misses(self):
+        """Test the cache reports its hit and miss counters."""
+        self.backend.authenticate_credentials(self.token.key)
+        self.backend.authenticate_credentials(self.token.key)
+        stats = authentication.get_token_stats()
+        self.assertEqual(stats['local_hits'], 1)
+        self.assertEqual(stats['size'], 1)
+        self.assertGreaterEqual(stats['misses'], 1)
+
+
+    def test_api_accepts_cached_token(self):
+        """Test the api authenticates requests with the cached backend."""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        response = client.get(reverse('ListCreateSkill'), format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CachedBasicAuthenticationTestCase(TestCase):
+    """Test suite for the cached basic authentication backend."""
+
+    def setUp(self):
+        """Define the backend and a user with a password."""
+        authentication.credential_cache.clear()
+        authentication.generation_cache.clear()
+        self.backend = authentication.CachedBasicAuthentication()
+        self.user = User.objects.create(username="jpc")
+        self.user.set_password("secret-password")
+        self.user.save()
+        authentication.invalidate_credentials(self.user.username)
+
+
+    def test_credentials_are_verified_once(self):
+        """Test repeated credentials skip the password hasher."""
+        with mock.patch(
+            'django.contrib.auth.base_user.check_password',
+            wraps=check_password
+        ) as checker:
+            for _ in range(3):
+                user, auth = self.backend.authenticate_credentials(
+                    "jpc",
+                    "secret-password"
+                )
+        self.assertEqual(user, self.user)
+        self.assertEqual(checker.call_count, 1)
+        self.assertEqual(
+            authentication.get_credential_stats()['local_hits'],
+            2
+        )
+
+
+    def test_shared_cache_keeps_only_the_user_pk(self):
+        """Test the shared cache never holds the password hash."""
+        self.backend.authenticate_credentials("jpc", "secret-password")
+        cache_key = authentication._credential_cache_key(
+            "jpc",
+            "secret-password"
+        )
+        self.assertEqual(cache.get(cache_key), self.user.pk)
+
+        authentication.credential_cache.clear()
+        with mock.patch(
+            'django.contrib.auth.base_user.check_password'
+        ) as checker, self.assertNumQueries(1):
+            user, auth = self.backend.authenticate_credentials(
+                "jpc",
+                "secret-password"
+            )
+        self.assertEqual(user, self.user)
+        self.assertFalse(checker.called)
+
+
+    def test_wrong_password_is_not_cached(self):
+        """Test failed verifications are never remembered."""
+        for _ in range(2):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                self.backend.authenticate_credentials("jpc", "wrong")
+        self.assertEqual(len(authentication.credential_cache), 0)
+
+
+    def test_password_change_invalidates_credentials(self):
+        """Test the old password stops working once it is changed."""
+        self.backend.authenticate_credentials("jpc", "secret-password")
+        self.user.set_password("new-password")
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials("jpc", "secret-password")
+        user, auth = self.backend.authenticate_credentials(
+            "jpc",
+            "new-password"
+        )
+        self.assertEqual(user, self.user)
+
+
+    def test_api_accepts_cached_basic_credentials(self):
+        """Test the api authenticates requests with the cached backend."""
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION='Basic ' + base64.b64encode(
+                b'jpc:secret-password'
+            ).decode()
+        )
+        response = client.get(reverse('ListCreateSkill'), format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TTLCacheTestCase(TestCase):
+    """Test suite for the bounded TTL cache."""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache never grows past its maximum size."""
+        ttl_cache = authentication.TTLCache(max_size=2, ttl=60)
+        ttl_cache.set('a', 1)
+        ttl_cache.set('b', 2)
+        ttl_cache.get('a')
+        ttl_cache.set('c', 3)
+        self.assertEqual(ttl_cache.get('a'), 1)
+        self.assertIsNone(ttl_cache.get('b'))
+        self.assertEqual(len(ttl_cache), 2)
+
+
+    def test_expired_entry_is_dropped(self):
+        """Test entries are not returned once their TTL passes."""
+        ttl_cache = authentication.TTLCache(max_size=2, ttl=-1)
+        ttl_cache.set('a', 1)
+        self.assertIsNone(ttl_cache.get('a'))
+        self.assertEqual(len(ttl_cache), 0)
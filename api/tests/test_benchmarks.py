@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase
+
+from .. import benchmarks
+
+
+class CompareTestCase(SimpleTestCase):
+    """Test suite for comparing benchmark results against a baseline."""
+
+    def setUp(self):
+        """Define a baseline with one query count and one throughput."""
+        self.baseline = {
+            '10': {
+                'SkillDetails': {'queries': 4},
+                'token': {'requests_per_second': 100.0},
+            }
+        }
+
+
+    def test_percentile_uses_nearest_rank(self):
+        """Test the percentile picks the nearest ranked value."""
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(benchmarks.percentile(values, 50), 3)
+        self.assertEqual(benchmarks.percentile(values, 100), 5)
+
+
+    def test_compare_accepts_small_changes(self):
+        """Test changes within the threshold are not regressions."""
+        results = {
+            '10': {
+                'SkillDetails': {'queries': 4},
+                'token': {'requests_per_second': 90.0},
+            }
+        }
+        self.assertEqual(
+            benchmarks.compare(self.baseline, results, 0.25),
+            []
+        )
+
+
+    def test_compare_reports_regressions(self):
+        """Test more queries and fewer requests per second regress."""
+        results = {
+            '10': {
+                'SkillDetails': {'queries': 6},
+                'token': {'requests_per_second': 50.0},
+            }
+        }
+        self.assertEqual(benchmarks.compare(self.baseline, results, 0.25), [
+            ('10.SkillDetails.queries', 4, 6),
+            ('10.token.requests_per_second', 100.0, 50.0),
+        ])
@@ -0,0 +1,175 @@
+from django.db import connection
+from django.db.models.signals import post_save
+from django.urls import reverse
+from rest_framework import status
+
+from .. import models
+from .. import signals
+from .. import snapshots
+from .base import SeededTestCase
+
+
+class BulkCreateTestCase(SeededTestCase):
+    """Test suite for posting a JSON array to the list views."""
+    seed_size = 2
+
+    def skill(self, name):
+        """Return the post data of a skill."""
+        return {
+            'name': name,
+            'logo': 'logo.png',
+            'last_project': 'Portfolio',
+            'website': 'https://www.example.com/',
+            'documentation': 'https://www.example.com/docs/',
+            'github': 'https://github.com/example',
+            'why': 'Because',
+        }
+
+
+    def test_array_creates_every_row(self):
+        """Test an array of experiences creates one row per item."""
+        data = [
+            {
+                'order': i,
+                'job_title': 'Job {}'.format(i),
+                'company': 'Company',
+                'start_date': '2018',
+                'end_date': '2019',
+                'place': 'Bogota',
+                'summary': 'Summary',
+            } for i in range(3)
+        ]
+        response = self.client.post(
+            reverse('ListCreateExperience'),
+            data,
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [row['job_title'] for row in response.data],
+            ['Job 0', 'Job 1', 'Job 2']
+        )
+        self.assertTrue(all(row['id'] for row in response.data))
+        self.assertEqual(
+            models.Experience.objects.filter(
+                owner=self.user,
+                job_title__startswith='Job'
+            ).count(),
+            3
+        )
+
+
+    def test_array_links_many_to_many_relations(self):
+        """Test the categories of bulk created skills are linked."""
+        categories = [
+            category.pk for category in self.rows[models.SkillCategory]
+        ]
+        data = [
+            dict(self.skill('Bulk {}'.format(i)), category=categories)
+            for i in range(2)
+        ]
+        response = self.client.post(
+            reverse('ListCreateSkill'),
+            data,
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        for skill in models.Skill.objects.filter(name__startswith='Bulk'):
+            self.assertEqual(
+                sorted(skill.category.values_list('pk', flat=True)),
+                categories
+            )
+
+
+    def test_array_errors_are_reported_per_row(self):
+        """Test an invalid row rejects the whole array with its errors."""
+        row = {
+            'order': 0,
+            'place': 'One',
+            'place_logo': 'logo.png',
+            'description': 'Description',
+            'website': 'https://www.example.com/',
+        }
+        data = [row, dict(row, place='')]
+        response = self.client.post(
+            reverse('ListCreateEducation'),
+            data,
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('place', response.data[1])
+        self.assertFalse(
+            models.Education.objects.filter(place='One').exists()
+        )
+
+
+    def test_array_drops_menu_snapshots(self):
+        """Test bulk created menus show up in the menu list."""
+        version = snapshots.get_version(self.user.id)
+        response = self.client.post(
+            reverse('ListCreateMenu'),
+            [{'name': 'Bulk menu'}],
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(snapshots.get_version(self.user.id), version)
+        self.assertContains(
+            self.client.get(reverse('ListCreateMenu'), format="json"),
+            'Bulk menu'
+        )
+
+
+    def test_repeated_unique_values_are_rejected(self):
+        """Test a unique value posted twice fails on the repeated row."""
+        response = self.client.post(
+            reverse('ListCreateSkill'),
+            [self.skill('Twice'), self.skill('Twice')],
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('name', response.data[1])
+        self.assertFalse(models.Skill.objects.filter(name='Twice').exists())
+
+
+    def test_empty_array_is_rejected(self):
+        """Test posting an empty array is a bad request."""
+        response = self.client.post(
+            reverse('ListCreateSkill'),
+            [],
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_rows_send_one_signal_each(self):
+        """Test every row sends either post_save or bulk_created, not both."""
+        sent = []
+        for signal in (post_save, signals.bulk_created):
+            def receiver(sender, signal=signal, **kwargs):
+                sent.append(signal)
+            signal.connect(receiver, sender=models.Skill, weak=False)
+            self.addCleanup(signal.disconnect, receiver, sender=models.Skill)
+
+        response = self.client.post(
+            reverse('ListCreateSkill'),
+            [self.skill('One'), self.skill('Two')],
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        if connection.features.can_return_ids_from_bulk_insert:
+            self.assertEqual(sent, [signals.bulk_created])
+        else:
+            self.assertEqual(sent, [post_save, post_save])
+
+
+    def test_single_row_still_creates_one_row(self):
+        """Test posting a single object keeps working."""
+        response = self.client.post(
+            reverse('ListCreateSkillCategory'),
+            {'name': 'Category', 'url': 'category'},
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['name'], 'Category')
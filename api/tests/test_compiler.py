@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from .. import compiler
+from .. import models
+from .. import serializers
+from .base import SeededTestCase
+
+FLAT_SERIALIZERS = (
+    serializers.ExperienceSerializer,
+    serializers.EducationSerializer,
+    serializers.CourseSerializer,
+    serializers.TestimonySerializer,
+    serializers.CaseStudySerializer,
+    serializers.SkillChartSerializer,
+    serializers.SkillCategorySerializer,
+    serializers.ProgramCategorySerializer,
+    serializers.ProgramSerializer,
+    serializers.ResourceCategorySerializer,
+    serializers.SubMenuItemSerializer,
+)
+
+
+class CompilerTestCase(SeededTestCase):
+    """Test suite for the compiled read functions of flat serializers."""
+
+    def assertParity(self, serializer_class, queryset):
+        """Assert the compiled output renders to the serializer's bytes."""
+        renderer = JSONRenderer()
+        compiled = compiler.get_compiled(serializer_class)
+        self.assertIsNotNone(compiled, serializer_class.__name__)
+        self.assertEqual(
+            renderer.render(compiled.serialize(queryset)),
+            renderer.render(serializer_class(queryset, many=True).data),
+            serializer_class.__name__
+        )
+
+
+    def test_compiled_output_matches_the_serializers(self):
+        """Test every flat serializer renders the same bytes compiled."""
+        for serializer_class in FLAT_SERIALIZERS:
+            model = serializer_class.Meta.model
+            self.assertParity(serializer_class, model.objects.order_by('pk'))
+
+
+    def test_compiled_output_keeps_nulls_and_unicode(self):
+        """Test null columns and non ascii text match the serializers."""
+        program = self.rows[models.Program][0]
+        program.program_category = None
+        program.name = 'Diseño ☃ "quoted"'
+        program.save()
+        self.assertParity(
+            serializers.ProgramSerializer,
+            models.Program.objects.order_by('pk')
+        )
+
+
+    def test_nested_serializers_are_not_compiled(self):
+        """Test serializers reading nested or many relations are skipped."""
+        for serializer_class in (
+            serializers.SkillSerializer,
+            serializers.MenuSerializer,
+            serializers.ResourceSerializer,
+            serializers.TagSerializer,
+        ):
+            self.assertIsNone(compiler.get_compiled(serializer_class))
+
+
+    def test_list_view_skips_model_instances(self):
+        """Test a flat list is served from tuples with the same bytes."""
+        url = reverse('ListCreateExperience')
+        with mock.patch.object(
+            models.Experience,
+            'from_db',
+            side_effect=AssertionError('Model instance built.')
+        ):
+            response = self.client.get(url, format="json")
+        self.assertEqual(
+            response.content,
+            JSONRenderer().render(serializers.ExperienceSerializer(
+                models.Experience.objects.order_by('order'),
+                many=True
+            ).data)
+        )
+        streamed = self.client.get(url + '?stream=true', format="json")
+        self.assertEqual(
+            b''.join(streamed.streaming_content),
+            response.content
+        )
+
+
+    def test_pages_still_use_the_serializer(self):
+        """Test paginated flat lists keep their cursor links."""
+        response = self.client.get(
+            reverse('ListCreateCourse'),
+            {'page_size': 2},
+            format="json"
+        )
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
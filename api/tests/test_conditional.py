@@ -0,0 +1,166 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+
+from .. import factories
+from .. import models
+from .. import versions
+from .base import SeededTestCase
+
+
+class ConditionalGetTestCase(SeededTestCase):
+    """Test suite for the conditional GET support of the api views."""
+
+    def age_version(self, seconds=60):
+        """Date the data version of the user some seconds back."""
+        version, modified = versions.get_version(self.user.pk)
+        cache.set(
+            versions.VERSION_KEY.format(self.user.pk),
+            (version, modified - seconds),
+            None
+        )
+
+
+    def test_list_answers_with_validators(self):
+        """Test list responses carry an ETag and a Last-Modified header."""
+        self.age_version()
+        response = self.client.get(reverse('ListCreateSkill'), format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+
+    def test_unchanged_list_is_not_modified(self):
+        """Test a matching If-None-Match skips the serializer."""
+        url = reverse('ListCreateSkill')
+        etag = self.client.get(url, format="json")['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                url,
+                format="json",
+                HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+
+    def test_if_modified_since_is_honoured(self):
+        """Test a current If-Modified-Since gets a 304."""
+        self.age_version()
+        url = reverse('ListCreateCourse')
+        last_modified = self.client.get(url, format="json")['Last-Modified']
+        response = self.client.get(
+            url,
+            format="json",
+            HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+    def test_recent_changes_send_no_last_modified(self):
+        """Test a date within the current second is not sent."""
+        response = self.client.get(reverse('ListCreateSkill'), format="json")
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+
+    def test_deletes_are_modifications(self):
+        """Test deleting a row answers an old If-Modified-Since in full."""
+        self.age_version(120)
+        url = reverse('ListCreateCourse')
+        last_modified = self.client.get(url, format="json")['Last-Modified']
+        models.Course.objects.first().delete()
+        response = self.client.get(
+            url,
+            format="json",
+            HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+        self.age_version()
+        response = self.client.get(url, format="json")
+        self.assertNotEqual(response['Last-Modified'], last_modified)
+
+
+    def test_owner_renames_produce_a_new_etag(self):
+        """Test renaming the owner changes the ETag of its rows."""
+        url = reverse('ListCreateCourse')
+        etag = self.client.get(url, format="json")['ETag']
+        self.user.username = 'renamed'
+        self.user.save()
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['owner'], 'renamed')
+
+
+    def test_changes_produce_a_new_etag(self):
+        """Test saves, deletes and many to many changes change the ETag."""
+        url = reverse('ListCreateSkill')
+        skill = models.Skill.objects.first()
+        etags = [self.client.get(url, format="json")['ETag']]
+
+        skill.category.clear()
+        etags.append(self.client.get(url, format="json")['ETag'])
+        models.SkillChart.objects.last().delete()
+        etags.append(self.client.get(url, format="json")['ETag'])
+        skill.name = 'Renamed'
+        skill.save()
+        response = self.client.get(
+            url,
+            format="json",
+            HTTP_IF_NONE_MATCH=etags[-1]
+        )
+        etags.append(response['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(set(etags)), 4)
+
+
+    def test_other_owners_leave_the_etag_alone(self):
+        """Test changes to the related rows of another user keep the ETag."""
+        url = reverse('ListCreateSkill')
+        etag = self.client.get(url, format="json")['ETag']
+        other = User.objects.create(username="other")
+        factories.seed(other, 2, prefix='other')
+        models.SkillChart.objects.filter(
+            skill__owner=other
+        ).update(modified_at=timezone.now())
+        self.assertEqual(self.client.get(url, format="json")['ETag'], etag)
+
+
+    def test_unchanged_detail_is_not_modified(self):
+        """Test detail views answer conditional requests too."""
+        program = models.Program.objects.first()
+        url = reverse('ProgramDetails', kwargs={'pk': program.id})
+        etag = self.client.get(url, format="json")['ETag']
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        other = models.Program.objects.last()
+        response = self.client.get(
+            reverse('ProgramDetails', kwargs={'pk': other.id}),
+            format="json",
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+    def test_menus_use_the_snapshot_version(self):
+        """Test unchanged menus get a 304 without touching the database."""
+        url = reverse('ListCreateMenu')
+        etag = self.client.get(url, format="json")['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                url,
+                format="json",
+                HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        models.SubMenuItem.objects.first().save()
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,100 @@
+from unittest import mock, skipUnless
+
+from django.core.signals import request_started
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TransactionTestCase
+
+from .. import db
+
+
+class CheckConnectionsTestCase(SimpleTestCase):
+    """Test suite for the health check of kept alive connections."""
+
+    def setUp(self):
+        """Define an open connection with health checks turned on."""
+        self.connection = mock.Mock(
+            settings_dict={'HEALTH_CHECK_INTERVAL': 10},
+            connection=object(),
+            health_checked_at=None
+        )
+        patcher = mock.patch.object(db, 'connections')
+        patcher.start().all.return_value = [self.connection]
+        self.addCleanup(patcher.stop)
+
+
+    def test_dead_connections_are_closed(self):
+        """Test a connection failing the ping is closed."""
+        self.connection.is_usable.return_value = False
+        db.check_connections()
+        self.connection.close.assert_called_once_with()
+
+
+    def test_live_connections_are_kept(self):
+        """Test a connection answering the ping stays open."""
+        self.connection.is_usable.return_value = True
+        db.check_connections()
+        self.connection.close.assert_not_called()
+
+
+    def test_pings_are_spaced_by_the_interval(self):
+        """Test a connection is pinged once per interval at most."""
+        self.connection.is_usable.return_value = True
+        db.check_connections()
+        db.check_connections()
+        self.assertEqual(self.connection.is_usable.call_count, 1)
+
+
+    def test_checks_can_be_turned_off(self):
+        """Test connections without an interval are never pinged."""
+        self.connection.settings_dict = {}
+        db.check_connections()
+        self.connection.is_usable.assert_not_called()
+
+
+    def test_requests_run_the_check(self):
+        """Test the app config connects the check to request_started."""
+        self.connection.is_usable.return_value = False
+        request_started.send(sender=None)
+        self.connection.close.assert_called_once_with()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Needs PostgreSQL.')
+class PooledBackendTestCase(TransactionTestCase):
+    """Test suite for the pooled PostgreSQL backend."""
+
+    def test_closed_connections_return_to_the_pool(self):
+        """Test a closed connection is handed out again."""
+        from ..db.pooled.base import DatabaseWrapper
+
+        wrapper = DatabaseWrapper(
+            dict(connection.settings_dict, POOL_SIZE=1),
+            'pooled'
+        )
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        self.assertFalse(raw.closed)
+
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, raw)
+        wrapper.close()
+
+
+    def test_empty_pool_waits_then_times_out(self):
+        """Test a thread finding the pool empty waits for POOL_TIMEOUT."""
+        from ..db.pooled.base import DatabaseWrapper
+
+        settings_dict = dict(
+            connection.settings_dict,
+            POOL_SIZE=1,
+            POOL_TIMEOUT=0.1
+        )
+        first = DatabaseWrapper(settings_dict, 'pooled-timeout')
+        second = DatabaseWrapper(settings_dict, 'pooled-timeout')
+        first.ensure_connection()
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+
+        first.close()
+        second.ensure_connection()
+        second.close()
@@ -0,0 +1,77 @@
+from unittest import skipIf, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from rest_framework.mixins import ListModelMixin
+
+from .. import factories
+from .. import urls
+from ..pagination import KeysetPagination
+from ..management.commands.check_indexes import view_querysets
+
+
+class CheckIndexesTestCase(TestCase):
+    """Test suite for the index coverage check."""
+
+    def setUp(self):
+        """Define a few rows of every model."""
+        self.user = User.objects.create(username="jpc")
+        factories.seed(self.user, 3)
+
+
+    def test_every_view_queryset_is_checked(self):
+        """Test the check explains a queryset for every api view."""
+        names = [name for name, queryset in view_querysets(25)]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertIn('SearchSkills', names)
+        self.assertIn('ResourceDetails', names)
+        self.assertIn('ListCreateMenu', names)
+
+
+    def test_querysets_are_scoped_to_a_user(self):
+        """Test the checked querysets filter on the id of a real owner."""
+        querysets = dict(view_querysets(25, self.user))
+        sql = str(querysets['ListCreateSkill'].query)
+        self.assertIn('"owner_id" = {}'.format(self.user.pk), sql)
+        self.assertNotIn('IS NULL', sql)
+
+
+    def test_list_orderings_have_an_owner_index(self):
+        """Test every list view ordering matches an (owner, ...) index."""
+        paginator = KeysetPagination()
+        for pattern in urls.urlpatterns:
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class is None or not issubclass(
+                view_class,
+                ListModelMixin
+            ):
+                continue
+            model = view_class.serializer_class.Meta.model
+            if not hasattr(model, 'owner'):
+                continue
+            ordering = paginator.get_ordering(None, None, view_class)
+            fields = [field.lstrip('-') for field in ordering]
+            if not all(hasattr(model, field) for field in fields):
+                # Orderings on annotations cannot be indexed.
+                continue
+            self.assertIn(
+                ['owner'] + fields,
+                [index.fields for index in model._meta.indexes],
+                pattern.name
+            )
+
+
+    @skipIf(connection.vendor == 'postgresql', 'Runs on other databases.')
+    def test_check_needs_postgresql(self):
+        """Test the check refuses to run on other databases."""
+        with self.assertRaises(CommandError):
+            call_command('check_indexes')
+
+
+    @skipUnless(connection.vendor == 'postgresql', 'Needs PostgreSQL.')
+    def test_view_querysets_are_covered(self):
+        """Test no view queryset scans a table over the threshold."""
+        call_command('check_indexes', min_rows=0)
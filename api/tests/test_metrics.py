@@ -0,0 +1,212 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from .. import metrics
+from .base import SeededTestCase
+
+
+class MetricsTestCase(SeededTestCase):
+    """Test suite for the request metrics and the /metrics/ endpoint."""
+
+    def setUp(self):
+        """Define the test client, a few rows and an empty metrics store."""
+        super().setUp()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(METRICS_DIR=directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.directory = directory
+
+        metrics.registry.__init__()
+        self.addCleanup(metrics.registry.__init__)
+
+
+    def scrape(self):
+        """Return the lines served by /metrics/."""
+        response = self.client.get(reverse('Metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return response.content.decode().splitlines()
+
+
+    def test_requests_are_counted_by_route(self):
+        """Test the count, queries and histograms of a route are served."""
+        for _ in range(2):
+            self.client.get(reverse('ListCreateSkill'), format="json")
+        lines = self.scrape()
+        self.assertIn(
+            'api_requests_total{route="ListCreateSkill",method="GET",'
+            'status="200"} 2',
+            lines
+        )
+        self.assertIn(
+            'api_request_duration_seconds_bucket{route="ListCreateSkill",'
+            'le="+Inf"} 2',
+            lines
+        )
+        self.assertIn(
+            'api_response_size_bytes_count{route="ListCreateSkill"} 2',
+            lines
+        )
+        prefix = 'api_db_queries_total{route="ListCreateSkill"}'
+        queries = [line for line in lines if line.startswith(prefix)]
+        self.assertEqual(len(queries), 1)
+        self.assertGreater(int(queries[0].split()[-1]), 0)
+
+
+    def test_values_above_the_largest_bound_are_in_the_inf_bucket(self):
+        """Test the +Inf bucket of a histogram always equals its count."""
+        labels = (('route', 'Slow'),)
+        for seconds in (0.001, 20.0):
+            metrics.registry.observe(
+                'api_request_duration_seconds',
+                labels,
+                seconds,
+                metrics.LATENCY_BUCKETS
+            )
+        lines = self.scrape()
+        self.assertIn(
+            'api_request_duration_seconds_bucket{route="Slow",le="10.0"} 1',
+            lines
+        )
+        self.assertIn(
+            'api_request_duration_seconds_bucket{route="Slow",le="+Inf"} 2',
+            lines
+        )
+        self.assertIn(
+            'api_request_duration_seconds_count{route="Slow"} 2',
+            lines
+        )
+
+
+    def test_endpoint_runs_no_query(self):
+        """Test /metrics/ is served without the database."""
+        self.client.get(reverse('ListCreateSkill'), format="json")
+        with self.assertNumQueries(0):
+            self.client.get(reverse('Metrics'))
+
+
+    def test_processes_are_summed(self):
+        """Test the files of other worker processes are added up."""
+        self.client.get(reverse('ListCreateCourse'), format="json")
+        metrics.flush(force=True)
+        with open(os.path.join(self.directory, '{}.json'.format(
+            os.getpid()
+        ))) as source:
+            data = json.load(source)
+        with open(os.path.join(self.directory, '1.json'), 'w') as output:
+            json.dump(data, output)
+        self.assertIn(
+            'api_requests_total{route="ListCreateCourse",method="GET",'
+            'status="200"} 2',
+            self.scrape()
+        )
+
+
+    def read_own_file(self):
+        """Return the metric file of this process after a request."""
+        self.client.get(reverse('ListCreateCourse'), format="json")
+        metrics.flush(force=True)
+        with open(os.path.join(self.directory, '{}.json'.format(
+            os.getpid()
+        ))) as source:
+            return json.load(source)
+
+
+    def test_dead_processes_are_merged(self):
+        """Test the file of an exited process is folded into dead.json."""
+        data = self.read_own_file()
+        child = subprocess.Popen(['true'])
+        child.wait()
+        path = os.path.join(self.directory, '{}.json'.format(child.pid))
+        with open(path, 'w') as output:
+            json.dump(data, output)
+        for _ in range(2):
+            self.assertIn(
+                'api_requests_total{route="ListCreateCourse",method="GET",'
+                'status="200"} 2',
+                self.scrape()
+            )
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(
+            os.path.exists(os.path.join(self.directory, metrics.DEAD_FILE))
+        )
+
+
+    def test_reused_pid_is_not_overwritten(self):
+        """Test a file left by an earlier process with our pid is kept."""
+        data = self.read_own_file()
+        data['process'] = 'earlier'
+        metrics.registry.__init__()
+        with open(os.path.join(self.directory, '{}.json'.format(
+            os.getpid()
+        )), 'w') as output:
+            json.dump(data, output)
+        self.client.get(reverse('ListCreateCourse'), format="json")
+        self.assertIn(
+            'api_requests_total{route="ListCreateCourse",method="GET",'
+            'status="200"} 2',
+            self.scrape()
+        )
+
+
+    def test_exit_merges_the_process_file(self):
+        """Test an exiting process moves its counters to dead.json."""
+        self.read_own_file()
+        metrics.mark_process_dead()
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            ['.lock', metrics.DEAD_FILE]
+        )
+        counters, histograms = metrics.collect()
+        self.assertEqual(counters[(
+            'api_requests_total',
+            (('route', 'ListCreateCourse'), ('method', 'GET'),
+             ('status', '200'))
+        )], 1)
+
+
+    def test_exit_leaves_other_directories_alone(self):
+        """Test a process only merges into the directory it wrote to."""
+        self.read_own_file()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(METRICS_DIR=directory):
+            metrics.mark_process_dead()
+        self.assertEqual(os.listdir(directory), [])
+
+
+    def test_cache_lookups_are_counted(self):
+        """Test menu snapshot hits and misses are served per cache."""
+        for _ in range(2):
+            self.client.get(reverse('ListCreateMenu'), format="json")
+        lines = self.scrape()
+        self.assertIn(
+            'api_cache_requests_total{cache="menus",result="hit"} 1',
+            lines
+        )
+        self.assertIn(
+            'api_cache_requests_total{cache="menus",result="miss"} 1',
+            lines
+        )
+
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_is_required_when_set(self):
+        """Test a missing or wrong bearer token is unauthorized."""
+        url = reverse('Metrics')
+        self.assertEqual(
+            self.client.get(url).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+class LeanMiddlewareTestCase(TestCase):
+    """Test suite for the path scoped middleware stack."""
+
+    def setUp(self):
+        """Define a token authenticated test client."""
+        user = User.objects.create(username="jpc")
+        self.authorization = 'Token ' + Token.objects.get(user=user).key
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+
+
+    def test_api_routes_skip_the_full_stack(self):
+        """Test API responses carry no session or framing machinery."""
+        response = self.client.get(reverse('ListCreateSkill'), format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertFalse(response.has_header('X-Frame-Options'))
+
+
+    def test_api_posts_need_no_csrf_token(self):
+        """Test token authenticated writes are not checked for CSRF."""
+        client = APIClient(enforce_csrf_checks=True)
+        client.credentials(HTTP_AUTHORIZATION=self.authorization)
+        response = client.post(
+            reverse('ListCreateSkillChart'),
+            {'name': 'Chart'},
+            format="json"
+        )
+        self.assertNotEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+    def test_browsable_api_pages_keep_framing_protection(self):
+        """Test HTML pages of the API routes keep X-Frame-Options."""
+        response = self.client.get(
+            reverse('ListCreateSkill'),
+            HTTP_ACCEPT='text/html'
+        )
+        self.assertEqual(response['X-Frame-Options'], 'SAMEORIGIN')
+
+
+    def test_admin_keeps_the_full_stack(self):
+        """Test the admin still gets sessions, CSRF and framing headers."""
+        response = self.client.get('/admin/login/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(hasattr(response.wsgi_request, 'session'))
+        self.assertTrue(hasattr(response.wsgi_request, 'user'))
+        self.assertIn('csrftoken', response.cookies)
+        self.assertTrue(response.has_header('X-Frame-Options'))
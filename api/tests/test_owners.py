@@ -0,0 +1,81 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+
+from .. import factories
+from .. import models
+from ..permissions import IsOwner
+from .base import SeededTestCase
+
+
+class OwnerScopingTestCase(SeededTestCase):
+    """Test suite for scoping every view to the rows of the user."""
+    seed_size = 2
+
+    def setUp(self):
+        """Define the test client and two portfolios."""
+        super().setUp()
+
+        self.other = User.objects.create(username="other")
+        self.other_rows = factories.seed(self.other, 2, prefix='other')
+
+
+    def test_lists_only_show_owned_rows(self):
+        """Test the lists leave out the rows of other users."""
+        for name in (
+            'ListCreateMenu',
+            'ListCreateSkill',
+            'ListCreateCourse',
+            'ListCreateResource',
+        ):
+            response = self.client.get(reverse(name), format="json")
+            self.assertEqual(len(response.json()), 2, name)
+            self.assertNotContains(response, 'other-')
+
+
+    def test_details_of_other_users_are_not_found(self):
+        """Test a detail view answers 404 for the rows of other users."""
+        skill = self.other_rows[models.Skill][0]
+        response = self.client.get(
+            reverse('SkillDetails', kwargs={'pk': skill.pk}),
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_reorder_ignores_rows_of_other_users(self):
+        """Test the rows of other users cannot be reordered."""
+        course = self.other_rows[models.Course][0]
+        response = self.client.post(
+            reverse('ReorderCourse'),
+            [{'id': course.pk, 'order': 10}],
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        course.refresh_from_db()
+        self.assertNotEqual(course.order, 10)
+
+
+    def test_search_and_tags_are_scoped(self):
+        """Test search hits and tag counts only cover owned rows."""
+        response = self.client.get(
+            reverse('Search'),
+            {'q': 'other'},
+            format="json"
+        )
+        self.assertEqual(response.data['case_studies'], [])
+        response = self.client.get(reverse('CaseStudyTags'), format="json")
+        self.assertEqual(
+            [(tag['name'], tag['count']) for tag in response.data],
+            [('design', 2), ('ux', 2)]
+        )
+
+
+    def test_object_permission_compares_ids(self):
+        """Test the owner check runs no query."""
+        menu = models.Menu.objects.get(pk=self.rows[models.Menu][0].pk)
+        request = type('Request', (), {'user': self.user})()
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                IsOwner().has_object_permission(request, None, menu)
+            )
@@ -0,0 +1,109 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from .. import models
+from .. import views
+from .base import SeededTestCase
+
+
+class KeysetPaginationTestCase(SeededTestCase):
+    """Test suite for the keyset pagination of the list views."""
+    seed_size = 7
+
+    def walk(self, url):
+        """Follow the next links from url and return every page."""
+        pages = []
+        while url:
+            response = self.client.get(url, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data['results'])
+            url = response.data['next']
+        return pages
+
+
+    def test_lists_are_not_paginated_by_default(self):
+        """Test a list without a page size returns every row."""
+        response = self.client.get(reverse('ListCreateSkill'), format="json")
+        self.assertEqual(len(response.data), 7)
+
+
+    def test_pages_follow_the_natural_ordering(self):
+        """Test pages walk the rows in the ordering of each view."""
+        pages = self.walk(reverse('ListCreateSkill') + '?page_size=3')
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        names = [row['name'] for page in pages for row in page]
+        self.assertEqual(names, sorted(names))
+
+        pages = self.walk(reverse('ListCreateExperience') + '?page_size=2')
+        orders = [row['order'] for page in pages for row in page]
+        self.assertEqual(orders, list(range(7)))
+
+        pages = self.walk(reverse('ListCreateResource') + '?page_size=4')
+        ids = [row['id'] for page in pages for row in page]
+        self.assertEqual(
+            ids,
+            list(models.Resource.objects.order_by('id').values_list(
+                'id',
+                flat=True
+            ))
+        )
+
+
+    def test_paginated_menus_bypass_the_snapshot(self):
+        """Test the menu list is paginated when a page size is sent."""
+        pages = self.walk(reverse('ListCreateMenu') + '?page_size=5')
+        self.assertEqual([len(page) for page in pages], [5, 2])
+
+
+    def test_deep_pages_run_the_same_queries(self):
+        """Test the last page costs as many queries as the first one."""
+        url = reverse('ListCreateCourse') + '?page_size=1'
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json")
+        while response.data['next']:
+            url = response.data['next']
+            response = self.client.get(url, format="json")
+        with self.assertNumQueries(1):
+            self.client.get(url, format="json")
+
+
+    def test_ties_are_broken_on_the_primary_key(self):
+        """Test rows sharing an ordering value are each sent once."""
+        models.Experience.objects.update(order=0)
+        url = reverse('ListCreateExperience') + '?page_size=2'
+        with CaptureQueriesContext(connection) as context:
+            pages = self.walk(url)
+        ids = [row['id'] for page in pages for row in page]
+        self.assertEqual(
+            ids,
+            sorted(models.Experience.objects.values_list('id', flat=True))
+        )
+        self.assertFalse(any(
+            'OFFSET' in query['sql'] for query in context.captured_queries
+        ))
+
+
+    def test_previous_links_walk_back(self):
+        """Test the previous link of a page returns the page before it."""
+        url = reverse('ListCreateSkill') + '?page_size=3'
+        first = self.client.get(url, format="json").data
+        second = self.client.get(first['next'], format="json").data
+        back = self.client.get(second['previous'], format="json").data
+        self.assertEqual(back['results'], first['results'])
+
+
+    def test_view_can_configure_page_size(self):
+        """Test a view turns pagination on by setting a page size."""
+        view = views.ListCreateTestimonyView
+        view.page_size = 4
+        try:
+            response = self.client.get(
+                reverse('ListCreateTestimony'),
+                format="json"
+            )
+        finally:
+            del view.page_size
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertIsNotNone(response.data['next'])
@@ -0,0 +1,111 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .. import factories
+from .. import profiling
+
+
+class ProfileTestCase(SimpleTestCase):
+    """Test suite for the phase timings of a profile."""
+
+    def test_nested_phases_are_exclusive(self):
+        """Test a phase does not count the phases run inside it."""
+        profile = profiling.Profile()
+        profile.enter('view')
+        profile.enter('db')
+        time.sleep(0.02)
+        profile.exit()
+        profile.exit()
+        profile.stop()
+        self.assertGreaterEqual(profile.durations['db'], 0.02)
+        self.assertLess(profile.durations['view'], 0.02)
+
+
+    def test_phases_do_nothing_without_a_profile(self):
+        """Test phases outside a profiled request record nothing."""
+        self.assertIsNone(profiling.get_profile())
+        with profiling.phase('view'):
+            pass
+        self.assertIsNone(profiling.get_profile())
+
+
+class ProfilingMiddlewareTestCase(TestCase):
+    """Test suite for the Server-Timing header of profiled requests."""
+
+    def setUp(self):
+        """Define a token authenticated test client and a few rows."""
+        user = User.objects.create(username="jpc")
+        factories.seed(user, 3)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=user).key
+        )
+        self.url = reverse('ListCreateSkill')
+
+
+    def test_requests_are_not_profiled_by_default(self):
+        """Test plain requests get no Server-Timing header."""
+        response = self.client.get(self.url, format="json")
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+    def test_signed_header_profiles_the_request(self):
+        """Test a signed header times every phase and logs them."""
+        with self.assertLogs('api.profiling', 'INFO') as logs:
+            response = self.client.get(
+                self.url,
+                format="json",
+                HTTP_X_PROFILE=profiling.make_token()
+            )
+        metrics = [
+            metric.split(';')[0]
+            for metric in response['Server-Timing'].split(', ')
+        ]
+        self.assertEqual(metrics, [
+            'auth',
+            'permissions',
+            'queryset',
+            'db',
+            'serialize',
+            'render',
+            'view',
+            'total',
+        ])
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['path'], self.url)
+        self.assertEqual(line['status'], 200)
+        self.assertGreater(line['queries'], 0)
+        self.assertLessEqual(
+            sum(value for key, value in line.items()
+                if key.endswith('_ms') and key != 'total_ms'),
+            line['total_ms']
+        )
+
+
+    def test_forged_header_is_ignored(self):
+        """Test a header with a bad signature does not profile."""
+        response = self.client.get(
+            self.url,
+            format="json",
+            HTTP_X_PROFILE='profile:forged'
+        )
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_requests_are_profiled(self):
+        """Test sampling profiles requests without the header."""
+        with self.assertLogs('api.profiling', 'INFO'):
+            response = self.client.get(
+                reverse('Search'),
+                {'q': 'seed'},
+                format="json"
+            )
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+        self.assertIn('queries"', response['Server-Timing'])
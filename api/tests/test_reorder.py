@@ -0,0 +1,100 @@
+from django.urls import reverse
+from rest_framework import status
+
+from .. import models
+from .. import snapshots
+from .base import SeededTestCase
+
+
+class ReorderTestCase(SeededTestCase):
+    """Test suite for the reorder endpoints."""
+
+    def test_reorder_runs_one_update(self):
+        """Test the new order of every row is written in one statement."""
+        skills = self.rows[models.Skill]
+        data = [
+            {'id': skill.pk, 'order': i}
+            for i, skill in enumerate(reversed(skills))
+        ]
+        # The lookup and the update, wrapped in a savepoint under the test
+        # transaction.
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                reverse('ReorderSkill'),
+                data,
+                format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(models.Skill.objects.order_by('order').values_list(
+                'pk',
+                flat=True
+            )),
+            [skill.pk for skill in reversed(skills)]
+        )
+
+
+    def test_reorder_bumps_modified_at(self):
+        """Test reordered rows get a new modified_at."""
+        testimony = self.rows[models.Testimony][0]
+        before = models.Testimony.objects.get(pk=testimony.pk).modified_at
+        self.client.post(
+            reverse('ReorderTestimony'),
+            [{'id': testimony.pk, 'order': 10}],
+            format="json"
+        )
+        testimony.refresh_from_db()
+        self.assertEqual(testimony.order, 10)
+        self.assertGreater(testimony.modified_at, before)
+
+
+    def test_reorder_rejects_unknown_rows(self):
+        """Test an unknown id fails the whole request."""
+        course = self.rows[models.Course][0]
+        response = self.client.post(
+            reverse('ReorderCourse'),
+            [{'id': course.pk, 'order': 10}, {'id': 0, 'order': 11}],
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('id', response.data[1])
+        course.refresh_from_db()
+        self.assertNotEqual(course.order, 10)
+
+
+    def test_reorder_rejects_repeated_rows(self):
+        """Test an id listed twice fails the whole request."""
+        course = self.rows[models.Course][0]
+        response = self.client.post(
+            reverse('ReorderCourse'),
+            [{'id': course.pk, 'order': 10}, {'id': course.pk, 'order': 11}],
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('id', response.data[1])
+        course.refresh_from_db()
+        self.assertNotIn(course.order, (10, 11))
+
+
+    def test_reorder_rejects_empty_requests(self):
+        """Test an empty array is a bad request."""
+        response = self.client.post(
+            reverse('ReorderCourse'),
+            [],
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_reorder_drops_menu_snapshots(self):
+        """Test reordering menu items drops the menu snapshots."""
+        item = self.rows[models.MenuItem][0]
+        version = snapshots.get_version(item.owner_id)
+        self.client.post(
+            reverse('ReorderMenuItem'),
+            [{'id': item.pk, 'order': 10}],
+            format="json"
+        )
+        self.assertNotEqual(snapshots.get_version(item.owner_id), version)
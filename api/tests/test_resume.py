@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+
+from .. import factories
+from .. import models
+from .base import SeededTestCase
+
+
+class ResumeViewTestCase(SeededTestCase):
+    """Test suite for the resume document."""
+
+    def test_resume_matches_the_list_endpoints(self):
+        """Test every section holds the list of its endpoint."""
+        response = self.client.get(reverse('Resume'), format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        document = response.json()
+        for section, name in (
+            ('experiences', 'ListCreateExperience'),
+            ('skills', 'ListCreateSkill'),
+            ('case_studies', 'ListCreateCaseStudy'),
+            ('menus', 'ListCreateMenu'),
+        ):
+            self.assertEqual(
+                document[section],
+                self.client.get(reverse(name), format="json").json()
+            )
+
+
+    def test_resume_sections_can_be_picked(self):
+        """Test ?sections= limits the document to the given sections."""
+        response = self.client.get(
+            reverse('Resume'),
+            {'sections': 'courses,skills'},
+            format="json"
+        )
+        self.assertEqual(list(response.json()), ['courses', 'skills'])
+
+        response = self.client.get(
+            reverse('Resume'),
+            {'sections': 'courses,secrets'},
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_resume_is_cached_until_a_row_changes(self):
+        """Test a cached document costs no query until the data changes."""
+        url = reverse('Resume')
+        self.client.get(url, format="json")
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, format="json")
+
+        models.Course.objects.filter(place='seed-0').update(place='Changed')
+        self.assertEqual(
+            self.client.get(url, format="json").content,
+            cached.content
+        )
+
+        course = models.Course.objects.get(place='Changed')
+        course.save()
+        self.assertContains(self.client.get(url, format="json"), 'Changed')
+
+
+    def test_resume_ignores_other_parameters(self):
+        """Test list parameters such as ?tag= do not filter the sections."""
+        url = reverse('Resume')
+        full = self.client.get(url, format="json")
+        for params in ({'tag': 'missing'}, {'fields': 'id'}):
+            response = self.client.get(url, params, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, full.content)
+
+
+    def test_other_owners_keep_the_cached_resume(self):
+        """Test a change to another user's rows keeps the document cached."""
+        url = reverse('Resume')
+        self.client.get(url, format="json")
+        other = User.objects.create(username="other")
+        factories.seed(other, 1, prefix='other')
+        models.Course.objects.filter(owner=other).first().save()
+        with self.assertNumQueries(0):
+            self.client.get(url, format="json")
+
+
+    def test_resume_answers_conditional_requests(self):
+        """Test a matching If-None-Match gets a 304."""
+        url = reverse('Resume')
+        etag = self.client.get(url, format="json")['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
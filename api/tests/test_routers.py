@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .. import models
+from .. import routers
+from ..middleware import ReplicaStickinessMiddleware, _client_key
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTestCase(SimpleTestCase):
+    """Test suite for the read replica router."""
+
+    def setUp(self):
+        """Define the router and the lag of each replica."""
+        self.router = routers.ReplicaRouter()
+        self.lags = {'replica1': 0, 'replica2': 0}
+        patcher = mock.patch.object(
+            routers,
+            'get_lag',
+            side_effect=lambda alias: self.lags[alias]
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        routers.start_request()
+        self.addCleanup(routers.start_request)
+
+
+    def test_reads_go_to_the_replicas(self):
+        """Test reads are spread over the replicas."""
+        aliases = set(
+            self.router.db_for_read(models.Skill) for _ in range(50)
+        )
+        self.assertEqual(aliases, {'replica1', 'replica2'})
+
+
+    def test_writes_go_to_the_primary(self):
+        """Test writes go to the primary and pin the reads after them."""
+        self.assertEqual(self.router.db_for_write(models.Skill), 'default')
+        self.assertEqual(self.router.db_for_read(models.Skill), 'default')
+        self.assertTrue(routers.wrote())
+
+
+    def test_lagging_replicas_are_skipped(self):
+        """Test reads avoid a lagging replica, then fall back entirely."""
+        self.lags['replica1'] = 60
+        self.assertEqual(self.router.db_for_read(models.Skill), 'replica2')
+        self.lags['replica2'] = float('inf')
+        self.assertEqual(self.router.db_for_read(models.Skill), 'default')
+
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_leaves_routing_alone(self):
+        """Test the router steps aside without replicas."""
+        self.assertIsNone(self.router.db_for_read(models.Skill))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaStickinessMiddlewareTestCase(SimpleTestCase):
+    """Test suite for pinning a client to the primary after it writes."""
+
+    def setUp(self):
+        """Define a request of a client and a router."""
+        self.factory = RequestFactory(HTTP_AUTHORIZATION='Token sticky')
+        self.router = routers.ReplicaRouter()
+        patcher = mock.patch.object(routers, 'get_lag', return_value=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        keys = [
+            _client_key(RequestFactory(HTTP_AUTHORIZATION=header).get('/'))
+            for header in ('Token sticky', 'Token other')
+        ]
+        self.addCleanup(cache.delete_many, keys)
+        cache.delete_many(keys)
+
+
+    def read(self, request):
+        """Return a response naming the alias reads are routed to."""
+        return HttpResponse(self.router.db_for_read(models.Skill))
+
+
+    def write(self, request):
+        """Route a write and return an empty response."""
+        self.router.db_for_write(models.Skill)
+        return HttpResponse()
+
+
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        """Test the next request of a client that wrote reads the primary."""
+        read = ReplicaStickinessMiddleware(self.read)
+        self.assertEqual(read(self.factory.get('/')).content, b'replica1')
+
+        ReplicaStickinessMiddleware(self.write)(self.factory.post('/'))
+        self.assertEqual(read(self.factory.get('/')).content, b'default')
+
+        other = RequestFactory(HTTP_AUTHORIZATION='Token other').get('/')
+        self.assertEqual(read(other).content, b'replica1')
+
+
+    def test_pin_does_not_leak_out_of_the_request(self):
+        """Test the thread is unpinned once the request is done."""
+        ReplicaStickinessMiddleware(self.write)(self.factory.post('/'))
+        self.assertEqual(self.router.db_for_read(models.Skill), 'replica1')
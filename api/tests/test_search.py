@@ -0,0 +1,54 @@
+from django.urls import reverse
+from rest_framework import status
+
+from .base import SeededTestCase
+
+
+class SearchViewTestCase(SeededTestCase):
+    """Test suite for the full-text search endpoint."""
+
+    def test_search_finds_rows_of_every_collection(self):
+        """Test a keyword matches skills, programs, resources and studies."""
+        response = self.client.get(
+            reverse('Search'),
+            {'q': 'seed-1'},
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row['name'] for row in response.data['skills']],
+            ['seed-1']
+        )
+        self.assertEqual(len(response.data['programs']), 1)
+        self.assertEqual(len(response.data['resources']), 1)
+        self.assertEqual(len(response.data['case_studies']), 1)
+        self.assertIsNone(response.data['next'])
+
+
+    def test_search_is_paginated(self):
+        """Test hits are split in pages with a link to the next one."""
+        response = self.client.get(
+            reverse('Search'),
+            {'q': 'seed', 'page_size': 2},
+            format="json"
+        )
+        self.assertEqual(len(response.data['skills']), 2)
+        self.assertIn('page=2', response.data['next'])
+
+        response = self.client.get(response.data['next'], format="json")
+        self.assertEqual(len(response.data['skills']), 1)
+        self.assertIsNone(response.data['next'])
+
+
+    def test_search_runs_one_query_per_collection(self):
+        """Test the number of queries does not grow with the hits."""
+        # Skills also prefetch their categories.
+        with self.assertNumQueries(5):
+            self.client.get(reverse('Search'), {'q': 'seed'}, format="json")
+
+
+    def test_empty_search_returns_no_hits(self):
+        """Test a request without terms returns empty collections."""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('Search'), format="json")
+        self.assertEqual(response.data['skills'], [])
@@ -0,0 +1,120 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+
+from .. import models
+from .. import serializers
+from .. import slowqueries
+from .base import SeededTestCase
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001)
+class SlowQueriesTestCase(SeededTestCase):
+    """Test suite for the slow query log."""
+
+    def setUp(self):
+        """Define the test client, a few rows and an empty log."""
+        super().setUp()
+
+        slowqueries.clear()
+        self.addCleanup(slowqueries.clear)
+
+
+    def test_lazy_loads_are_attributed_to_the_field(self):
+        """Test a query run by a serializer field names that field."""
+        recorder = slowqueries.Recorder(slowqueries.get_threshold())
+        with connection.execute_wrapper(recorder):
+            serializers.SkillSerializer(
+                models.Skill.objects.all(),
+                many=True
+            ).data
+        fields = {record['field'] for record in slowqueries.get_records()}
+        self.assertIn('SkillSerializer.skill_chart', fields)
+
+
+    def test_requests_record_the_view_and_stack(self):
+        """Test the queries of a request name its view and path."""
+        self.client.get(reverse('ListCreateSkill'), format="json")
+        records = slowqueries.get_records()
+        self.assertTrue(records)
+        self.assertTrue(all(
+            record['path'] == reverse('ListCreateSkill')
+            for record in records
+        ))
+        self.assertIn(
+            'ListCreateSkillView.list',
+            {record['view'] for record in records}
+        )
+        self.assertTrue(any(
+            frame.startswith('api/')
+            for record in records
+            for frame in record['stack']
+        ))
+
+
+    def record_lookup(self):
+        """Return the record of a query filtering on a username."""
+        recorder = slowqueries.Recorder(slowqueries.get_threshold())
+        with connection.execute_wrapper(recorder):
+            User.objects.filter(username='secret-value', pk=1).exists()
+        return slowqueries.get_records()[0]
+
+
+    def test_params_are_redacted(self):
+        """Test only the number and types of the parameters are kept."""
+        record = self.record_lookup()
+        self.assertNotIn('secret-value', record['params'])
+        self.assertRegex(record['params'], r'^\d+ params: .*\bstr\b')
+
+
+    @override_settings(SLOW_QUERY_LOG_PARAMS=True)
+    def test_params_are_kept_when_asked(self):
+        """Test SLOW_QUERY_LOG_PARAMS keeps the parameter values."""
+        self.assertIn('secret-value', self.record_lookup()['params'])
+
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_zero_threshold_turns_the_log_off(self):
+        """Test nothing is recorded when the threshold is 0."""
+        self.client.get(reverse('ListCreateSkill'), format="json")
+        self.assertEqual(slowqueries.get_records(), [])
+
+
+    @override_settings(SLOW_QUERY_LOG_SIZE=3)
+    def test_ring_buffer_keeps_the_newest_records(self):
+        """Test older records are overwritten once the buffer is full."""
+        for _ in range(5):
+            slowqueries.add({'sql': 'SELECT 1'})
+        self.assertEqual(
+            [record['id'] for record in slowqueries.get_records()],
+            [5, 4, 3]
+        )
+
+
+    def test_admin_page_lists_the_records(self):
+        """Test staff users see the records and others are redirected."""
+        self.client.get(reverse('ListCreateSkill'), format="json")
+        url = reverse('slow-queries')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'api_skill')
+
+
+    def test_command_dumps_and_clears_the_log(self):
+        """Test the command writes the records as JSON and empties the log."""
+        self.client.get(reverse('ListCreateSkill'), format="json")
+        count = len(slowqueries.get_records())
+        output = StringIO()
+        call_command('slow_queries', '--json', '--clear', stdout=output)
+        self.assertEqual(len(json.loads(output.getvalue())), count)
+        self.assertEqual(slowqueries.get_records(), [])
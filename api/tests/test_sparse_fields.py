@@ -0,0 +1,143 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from .. import compiler
+from .. import mixins
+from .. import models
+from .base import SeededTestCase
+
+
+class SparseFieldsTestCase(SeededTestCase):
+    """Test suite for the ?fields= and ?exclude= projections."""
+
+    def get(self, url, params):
+        """Return the response and the SQL of a GET request."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params, format="json")
+        return response, ' '.join(query['sql'] for query in context)
+
+
+    def test_fields_trims_the_output_and_the_query(self):
+        """Test only the asked fields are serialized and selected."""
+        response, sql = self.get(
+            reverse('ListCreateSkill'),
+            {'fields': 'id,name,logo'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [list(row) for row in response.data],
+            [['id', 'name', 'logo']] * 3
+        )
+        self.assertNotIn('"why"', sql)
+        self.assertNotIn('api_skillchart', sql)
+        self.assertNotIn('api_skill_category', sql)
+
+
+    def test_exclude_drops_a_column_of_a_compiled_list(self):
+        """Test an excluded text column is neither sent nor selected."""
+        response, sql = self.get(
+            reverse('ListCreateCourse'),
+            {'exclude': 'main_focus'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('main_focus', response.data[0])
+        self.assertIn('course_title', response.data[0])
+        self.assertNotIn('main_focus', sql)
+
+
+    def test_fields_keeps_the_relations_it_reads(self):
+        """Test a kept relation is still joined and nested fields stay."""
+        response = self.client.get(
+            reverse('ListCreateSkill'),
+            {'fields': 'owner,skill_chart'},
+            format="json"
+        )
+        self.assertEqual(response.data[0]['owner'], 'jpc')
+        self.assertEqual(
+            response.data[0]['skill_chart']['title1'],
+            'One'
+        )
+
+
+    def test_menu_snapshots_are_bypassed(self):
+        """Test a projected menu list is serialized with nested fields."""
+        response = self.client.get(
+            reverse('ListCreateMenu'),
+            {'fields': 'id,menu_items'},
+            format="json"
+        )
+        self.assertEqual(list(response.data[0]), ['id', 'menu_items'])
+        self.assertIn('sub_menu_items', response.data[0]['menu_items'][0])
+
+
+    def test_detail_view_is_projected(self):
+        """Test a detail request honours ?fields= too."""
+        skill = self.rows[models.Skill][0]
+        response = self.client.get(
+            reverse('SkillDetails', kwargs={'pk': skill.pk}),
+            {'fields': 'name'},
+            format="json"
+        )
+        self.assertEqual(response.data, {'name': skill.name})
+
+
+    def test_unknown_fields_are_rejected(self):
+        """Test an unknown field name is a bad request."""
+        response = self.client.get(
+            reverse('ListCreateCourse'),
+            {'fields': 'id,nope'},
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+
+    def test_writes_ignore_the_projection(self):
+        """Test a POST validates and returns every field."""
+        response = self.client.post(
+            reverse('ListCreateSkillCategory') + '?fields=id',
+            {'name': 'Category', 'url': 'category'},
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['url'], 'category')
+
+
+    def test_composite_responses_ignore_the_projection(self):
+        """Test /search/ and /resume/ serve every field of their rows."""
+        skill = self.rows[models.Skill][0]
+        response = self.client.get(
+            reverse('Search'),
+            {'q': skill.name, 'fields': 'name'},
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(
+            reverse('Resume'),
+            {'sections': 'courses', 'fields': 'id'},
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('course_title', response.json()['courses'][0])
+
+
+    def test_fieldset_caches_are_bounded(self):
+        """Test cycling fieldsets does not grow the caches past their size."""
+        with mock.patch.object(mixins, 'EAGER_LOOKUPS_CACHE_SIZE', 2):
+            for name in ('logo', 'website', 'github', 'why'):
+                response = self.client.get(
+                    reverse('ListCreateSkill'),
+                    {'fields': 'id,' + name},
+                    format="json"
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(mixins._eager_lookups), 2)
+        self.assertEqual(
+            compiler.get_compiled.cache_info().maxsize,
+            compiler.COMPILED_CACHE_SIZE
+        )
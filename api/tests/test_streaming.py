@@ -0,0 +1,57 @@
+from django.urls import reverse
+from rest_framework import status
+
+from .. import views
+from .base import SeededTestCase
+
+
+class StreamingListTestCase(SeededTestCase):
+    """Test suite for the streamed list responses."""
+    seed_size = 5
+
+    def test_stream_matches_the_regular_response(self):
+        """Test a streamed list has the same bytes as the regular one."""
+        for name in ('ListCreateSkill', 'ListCreateResource'):
+            url = reverse(name)
+            regular = self.client.get(url, format="json")
+            streamed = self.client.get(url + '?stream=true', format="json")
+            self.assertEqual(streamed.status_code, status.HTTP_200_OK)
+            self.assertTrue(streamed.streaming)
+            self.assertEqual(
+                b''.join(streamed.streaming_content),
+                regular.content
+            )
+
+
+    def test_stream_can_be_asked_for_in_accept_header(self):
+        """Test the Accept header turns streaming on."""
+        response = self.client.get(
+            reverse('ListCreateProgram'),
+            HTTP_ACCEPT='application/json; stream=true'
+        )
+        self.assertTrue(response.streaming)
+
+
+    def test_stream_prefetches_each_chunk(self):
+        """Test streaming runs one prefetch per chunk instead of per row."""
+        view = views.ListCreateSkillView
+        view.stream_chunk_size = 2
+        try:
+            response = self.client.get(
+                reverse('ListCreateSkill') + '?stream=true',
+                format="json"
+            )
+            with self.assertNumQueries(4):
+                content = b''.join(response.streaming_content)
+        finally:
+            del view.stream_chunk_size
+        self.assertEqual(content.count(b'"logo"'), 5)
+
+
+    def test_empty_stream_is_an_empty_array(self):
+        """Test streaming an empty list yields an empty JSON array."""
+        response = self.client.get(
+            reverse('SearchSkills', kwargs={'url': 'missing'}) + '?stream=1',
+            format="json"
+        )
+        self.assertEqual(b''.join(response.streaming_content), b'[]')
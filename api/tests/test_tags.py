@@ -0,0 +1,153 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .. import models
+
+
+class CaseStudyTagsTestCase(TestCase):
+    """Test suite for the case study tags."""
+
+    def setUp(self):
+        """Define the test client and a few tagged case studies."""
+        user = User.objects.create(username="jpc")
+        for title, tags in (
+            ('One', 'Design, UX'),
+            ('Two', 'design'),
+            ('Three', 'ux, research, '),
+            ('Four', 'uxd'),
+        ):
+            models.CaseStudy.objects.create(
+                owner=user,
+                order=0,
+                title=title,
+                subtitle='Subtitle',
+                summary='Summary',
+                url=title,
+                tags=tags
+            )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+
+    def titles(self, params):
+        """Return the titles of the case studies listed with params."""
+        response = self.client.get(
+            reverse('ListCreateCaseStudy'),
+            params,
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(row['title'] for row in response.data)
+
+
+    def test_tags_are_normalized(self):
+        """Test the tags string is split, trimmed and lower cased."""
+        study = models.CaseStudy.objects.get(title='Three')
+        self.assertEqual(
+            sorted(study.tag_set.values_list('name', flat=True)),
+            ['research', 'ux']
+        )
+
+
+    def test_saving_the_string_updates_the_tags(self):
+        """Test changing the tags string relinks the tags."""
+        study = models.CaseStudy.objects.get(title='Two')
+        study.tags = 'research'
+        study.save()
+        self.assertEqual(
+            list(study.tag_set.values_list('name', flat=True)),
+            ['research']
+        )
+
+
+    def test_filter_matches_any_tag(self):
+        """Test ?tag= keeps case studies carrying any of the tags."""
+        self.assertEqual(self.titles({'tag': 'ux'}), ['One', 'Three'])
+        self.assertEqual(
+            self.titles({'tag': ['design', 'research']}),
+            ['One', 'Three', 'Two']
+        )
+
+
+    def test_empty_filter_is_ignored(self):
+        """Test a blank tag parameter lists every case study."""
+        for tag in ('', ',', ' , '):
+            self.assertEqual(
+                self.titles({'tag': tag}),
+                ['Four', 'One', 'Three', 'Two']
+            )
+
+
+    def test_filter_matches_every_tag(self):
+        """Test ?tag_match=all keeps case studies carrying every tag."""
+        self.assertEqual(
+            self.titles({'tag': ['design', 'ux'], 'tag_match': 'all'}),
+            ['One']
+        )
+
+
+    def test_many_case_studies_sync_in_constant_queries(self):
+        """Test syncing the tags of many case studies runs fixed queries."""
+        user = User.objects.get(username="jpc")
+
+        def sync(count):
+            studies = [
+                models.CaseStudy.objects.create(
+                    owner=user,
+                    order=0,
+                    title='Bulk',
+                    subtitle='Subtitle',
+                    summary='Summary',
+                    url='bulk',
+                    tags='design, ux'
+                )
+                for i in range(count)
+            ]
+            for i, study in enumerate(studies):
+                study.tags = 'bulk {0}, design, new {0}'.format(i)
+            with CaptureQueriesContext(connection) as queries:
+                models.sync_tags(studies)
+            return studies, len(queries)
+
+        few, few_queries = sync(2)
+        many, many_queries = sync(20)
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(
+            sorted(many[7].tag_set.values_list('name', flat=True)),
+            ['bulk 7', 'design', 'new 7']
+        )
+
+
+    def test_filter_adds_no_query(self):
+        """Test the tag filter runs inside the list query."""
+        url = reverse('ListCreateCaseStudy')
+        with self.assertNumQueries(1):
+            self.client.get(url, format="json")
+        with self.assertNumQueries(1):
+            self.client.get(url, {'tag': ['design', 'ux']}, format="json")
+
+
+    def test_tag_counts(self):
+        """Test the tag counts follow the tag filter."""
+        response = self.client.get(reverse('CaseStudyTags'), format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['name'], row['count']) for row in response.data],
+            [('design', 2), ('ux', 2), ('research', 1), ('uxd', 1)]
+        )
+
+        response = self.client.get(
+            reverse('CaseStudyTags'),
+            {'tag': 'research'},
+            format="json"
+        )
+        self.assertEqual(
+            [(row['name'], row['count']) for row in response.data],
+            [('research', 1), ('ux', 1)]
+        )
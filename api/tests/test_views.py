@@ -1,10 +1,16 @@
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.test import TestCase
 from django.urls import reverse
 
+from .. import factories
 from .. import models
+from .. import serializers
+from .. import snapshots
 
 
 class MenuViewTestCase(TestCase):
@@ -184,6 +190,135 @@ class MenuViewTestCase(TestCase):
         )
 
 
+class MenuTreeViewTestCase(TestCase):
+    """Test suite for the nested menu tree read path."""
+
+    def setUp(self):
+        """Define the test client and a menu tree of a few levels."""
+        user = User.objects.create(username="jpc")
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+        for m in range(3):
+            menu = models.Menu.objects.create(
+                owner=user,
+                name='Menu {}'.format(m)
+            )
+            for i in range(3):
+                item = models.MenuItem.objects.create(
+                    owner=user,
+                    title='Item {}.{}'.format(m, i)
+                )
+                menu.menu_items.add(item)
+                for j in range(3):
+                    item.sub_menu_items.add(
+                        models.SubMenuItem.objects.create(
+                            owner=user,
+                            order=3 - j,
+                            title='Sub {}.{}.{}'.format(m, i, j),
+                            url='sub/{}/{}/{}'.format(m, i, j)
+                        )
+                    )
+
+
+    def test_menu_tree_matches_serializer(self):
+        """Test the prefetched tree serializes exactly like the plain one."""
+        plain = serializers.MenuSerializer(
+            models.Menu.objects.all(),
+            many=True
+        ).data
+        tree = serializers.MenuSerializer(
+            models.Menu.objects.with_tree(),
+            many=True
+        ).data
+        self.assertEqual(
+            JSONRenderer().render(tree),
+            JSONRenderer().render(plain)
+        )
+
+
+    def test_menu_list_runs_fixed_number_of_queries(self):
+        """Test listing menus costs the same no matter the tree size."""
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('ListCreateMenu'),
+                format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 3)
+
+
+    def test_menu_details_runs_fixed_number_of_queries(self):
+        """Test getting a menu loads its tree in a fixed number of queries."""
+        menu = models.Menu.objects.first()
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('MenuDetails', kwargs={'pk': menu.id}),
+                format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+    def test_menu_list_is_served_from_snapshot(self):
+        """Test a second menu list request does not touch the database."""
+        first = self.client.get(reverse('ListCreateMenu'), format="json")
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('ListCreateMenu'), format="json")
+        self.assertEqual(second.content, first.content)
+
+
+    def test_menu_snapshot_is_invalidated_on_change(self):
+        """Test changes to the menu tree show up in the next response."""
+        self.client.get(reverse('ListCreateMenu'), format="json")
+        menu = models.Menu.objects.get(name='Menu 0')
+        sub_menu_item = models.SubMenuItem.objects.get(url='sub/1/1/1')
+        sub_menu_item.title = 'Renamed'
+        sub_menu_item.save()
+        menu.menu_items.clear()
+
+        response = self.client.get(
+            reverse('MenuDetails', kwargs={'pk': menu.id}),
+            format="json"
+        )
+        self.assertEqual(response.json()['menu_items'], [])
+        self.assertContains(
+            self.client.get(reverse('ListCreateMenu'), format="json"),
+            'Renamed'
+        )
+
+
+    def test_menu_snapshot_enforces_ownership(self):
+        """Test a menu snapshot is hidden from other users."""
+        menu = models.Menu.objects.first()
+        self.client.force_authenticate(
+            user=User.objects.create(username="other")
+        )
+        response = self.client.get(
+            reverse('MenuDetails', kwargs={'pk': menu.id}),
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_menu_snapshots_are_versioned_per_owner(self):
+        """Test a change only drops the snapshots of its owner."""
+        menu = models.Menu.objects.first()
+        other = User.objects.create(username="other")
+        self.client.get(reverse('ListCreateMenu'), format="json")
+        mine = snapshots.get_version(menu.owner_id)
+        theirs = snapshots.get_version(other.id)
+
+        menu.name = 'Renamed'
+        menu.save()
+        self.assertNotEqual(snapshots.get_version(menu.owner_id), mine)
+        self.assertEqual(snapshots.get_version(other.id), theirs)
+
+        other.last_login = menu.modified_at
+        other.save(update_fields=['last_login'])
+        self.assertEqual(snapshots.get_version(other.id), theirs)
+
+
 # Skill Views
 class SkillViewTestCase(TestCase):
     """Test suite for the Skill api views."""
@@ -1068,3 +1203,57 @@ class ResourceViewTestCase(TestCase):
             response.status_code,
             status.HTTP_204_NO_CONTENT
         )
+
+
+class ListQueryCountTestCase(TestCase):
+    """Test suite for the number of queries run by the list views."""
+
+    routes = (
+        ('ListCreateMenu', {}),
+        ('ListCreateMenuItem', {}),
+        ('ListCreateSubMenuItem', {}),
+        ('ListCreateSkillChart', {}),
+        ('ListCreateSkillCategory', {}),
+        ('ListCreateSkill', {}),
+        ('SearchSkills', {'url': 'seed-0'}),
+        ('ListCreateExperience', {}),
+        ('ListCreateProgramCategory', {}),
+        ('ListCreateProgram', {}),
+        ('SearchPrograms', {'url': 'seed-0'}),
+        ('ListCreateEducation', {}),
+        ('ListCreateCourse', {}),
+        ('ListCreateTestimony', {}),
+        ('ListCreateCaseStudy', {}),
+        ('ListCreateResourceCategory', {}),
+        ('ListCreateResource', {}),
+    )
+
+    def setUp(self):
+        """Define the test client and an owner for the seeded rows."""
+        self.user = User.objects.create(username="jpc")
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+
+    def count_queries(self):
+        """Return the number of queries each list route runs."""
+        counts = {}
+        for name, kwargs in self.routes:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    reverse(name, kwargs=kwargs),
+                    format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts[name] = len(queries)
+        return counts
+
+
+    def test_list_views_run_constant_number_of_queries(self):
+        """Test every list view runs the same queries for 1 or 10 rows."""
+        factories.seed(self.user, 1, prefix='seed')
+        few = self.count_queries()
+        factories.seed(self.user, 10, prefix='more')
+        many = self.count_queries()
+        self.assertEqual(many, few)
@@ -30,6 +30,11 @@ urlpatterns = {
         views.MenuItemDetailsView.as_view(),
         name="MenuItemDetails"
     ),
+    path(
+        'menu-items/reorder/',
+        views.ReorderMenuItemView.as_view(),
+        name="ReorderMenuItem"
+    ),
     path(
         'sub-menu-items/',
         views.ListCreateSubMenuItemView.as_view(),
@@ -40,6 +45,11 @@ urlpatterns = {
         views.SubMenuItemDetailsView.as_view(),
         name="SubMenuItemDetails"
     ),
+    path(
+        'sub-menu-items/reorder/',
+        views.ReorderSubMenuItemView.as_view(),
+        name="ReorderSubMenuItem"
+    ),
     path(
         'skill-charts/',
         views.ListCreateSkillChartView.as_view(),
@@ -70,6 +80,11 @@ urlpatterns = {
         views.SkillDetailsView.as_view(),
         name="SkillDetails"
     ),
+    path(
+        'skills/reorder/',
+        views.ReorderSkillView.as_view(),
+        name="ReorderSkill"
+    ),
     path(
         'skills/search/<url>/',
         views.SearchSkills.as_view(),
@@ -85,6 +100,11 @@ urlpatterns = {
         views.ExperienceDetailsView.as_view(),
         name="ExperienceDetails"
     ),
+    path(
+        'experiences/reorder/',
+        views.ReorderExperienceView.as_view(),
+        name="ReorderExperience"
+    ),
     path(
         'program-categories/',
         views.ListCreateProgramCategoryView.as_view(),
@@ -120,6 +140,11 @@ urlpatterns = {
         views.EducationDetailsView.as_view(),
         name="EducationDetails"
     ),
+    path(
+        'education/reorder/',
+        views.ReorderEducationView.as_view(),
+        name="ReorderEducation"
+    ),
     path(
         'courses/',
         views.ListCreateCourseView.as_view(),
@@ -130,6 +155,11 @@ urlpatterns = {
         views.CourseDetailsView.as_view(),
         name="CourseDetails"
     ),
+    path(
+        'courses/reorder/',
+        views.ReorderCourseView.as_view(),
+        name="ReorderCourse"
+    ),
     path(
         'testimonies/',
         views.ListCreateTestimonyView.as_view(),
@@ -140,16 +170,31 @@ urlpatterns = {
         views.TestimonyDetailsView.as_view(),
         name="TestimonyDetails"
     ),
+    path(
+        'testimonies/reorder/',
+        views.ReorderTestimonyView.as_view(),
+        name="ReorderTestimony"
+    ),
     path(
         'case-studies/',
         views.ListCreateCaseStudyView.as_view(),
         name="ListCreateCaseStudy"
     ),
+    path(
+        'case-studies/tags/',
+        views.CaseStudyTagsView.as_view(),
+        name="CaseStudyTags"
+    ),
     path(
         'case-studies/<int:pk>/',
         views.CaseStudyDetailsView.as_view(),
         name="CaseStudyDetails"
     ),
+    path(
+        'case-studies/reorder/',
+        views.ReorderCaseStudyView.as_view(),
+        name="ReorderCaseStudy"
+    ),
     path(
         'resource-categories/',
         views.ListCreateResourceCategoryView.as_view(),
@@ -170,6 +215,21 @@ urlpatterns = {
         views.ResourceDetailsView.as_view(),
         name="ResourceDetails"
     ),
+    path(
+        'resume/',
+        views.ResumeView.as_view(),
+        name="Resume"
+    ),
+    path(
+        'search/',
+        views.SearchView.as_view(),
+        name="Search"
+    ),
+    path(
+        'metrics/',
+        views.serve_metrics,
+        name="Metrics"
+    ),
     path(
         'get-token/',
         obtain_auth_token
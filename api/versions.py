@@ -0,0 +1,85 @@
+"""Per owner versions of the data served by the api.
+
+Every saved, deleted, reordered or relinked row bumps the version of the
+user owning it, in the default cache. Rows without an owner, such as
+skill charts and tags, bump the versions of the owners of the rows
+pointing at them. The conditional GET validators are derived from these
+versions, so telling whether a response is still current costs one cache
+read instead of a query per table, and deletes and renames are noticed
+like any other change.
+
+Each version is stored with the time it was set, which serves as the
+Last-Modified date of the responses built from it.
+"""
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'versions:{}'
+
+
+def _new_version():
+    """Return a fresh version and the time it was made."""
+    return uuid.uuid4().hex, time.time()
+
+
+def get_version(owner_id):
+    """Return the version of the data of an owner and when it was set.
+
+    A version missing from the cache is created, with the current time, so
+    the date only ever moves forward.
+    """
+    key = VERSION_KEY.format(owner_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def has_owner(model):
+    """Return True when the rows of the model belong to a user."""
+    return any(field.name == 'owner' for field in model._meta.fields)
+
+
+def get_owner_ids(model, rows):
+    """Return the ids of the users owning rows of model.
+
+    Rows without an owner belong to the owners of the rows referring to
+    them, which runs one query per such relation.
+    """
+    if has_owner(model):
+        return set(row.owner_id for row in rows)
+    owner_ids = set()
+    for relation in model._meta.related_objects:
+        if not has_owner(relation.related_model):
+            continue
+        owner_ids.update(relation.related_model.objects.filter(**{
+            '{}__in'.format(relation.field.name): [row.pk for row in rows]
+        }).values_list('owner_id', flat=True))
+    return owner_ids
+
+
+def _bump(owner_ids):
+    """Give each owner a new version."""
+    cache.set_many(
+        {VERSION_KEY.format(owner_id): _new_version()
+         for owner_id in owner_ids},
+        None
+    )
+
+
+def invalidate(*owner_ids):
+    """Bump the versions of the given owners.
+
+    The versions are bumped at once and again when the transaction
+    commits, so a response built before the commit is never taken as
+    current after it.
+    """
+    owner_ids = set(owner_ids)
+    if not owner_ids:
+        return
+    _bump(owner_ids)
+    transaction.on_commit(lambda: _bump(owner_ids))
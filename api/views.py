@@ -1,21 +1,74 @@
-from django.shortcuts import render
-from rest_framework import generics, permissions
+import hashlib
 
+from django.conf import settings
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from . import generics
 from . import serializers
+from . import metrics
 from . import models
+from . import profiling
+from . import resume
+from . import search
+from . import snapshots
+from .mixins import ProfilingMixin, filter_by_owner, get_eager_lookups
 from .permissions import IsOwner, IsOwnerMenuItem
 
 
+def filter_by_tags(queryset, request):
+    """Filter case studies by the ``?tag=`` parameters of a request.
+
+    The case studies carrying any of the tags are kept, or those carrying
+    all of them with ``?tag_match=all``. Empty values are ignored, so
+    ``?tag=`` lists every case study.
+    """
+    tags = models.parse_tags(','.join(request.query_params.getlist('tag')))
+    if not tags:
+        return queryset
+    return queryset.tagged(
+        tags,
+        match_all=request.query_params.get('tag_match') == 'all'
+    )
+
+
 # Menu Views
 class ListCreateMenuView(generics.ListCreateAPIView):
     """This class defines the create behavior of our rest api."""
-    queryset = models.Menu.objects.all()
+    queryset = models.Menu.objects.with_tree()
     serializer_class = serializers.MenuSerializer
     permission_classes = (
         permissions.IsAuthenticated,
         IsOwner,
     )
 
+    def list(self, request, *args, **kwargs):
+        """Serve the menu list from its pre-rendered snapshot."""
+        if (not isinstance(request.accepted_renderer, JSONRenderer) or
+                self.paginator.get_page_size(request) or
+                serializers.get_sparse_fieldset(request)):
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            request,
+            lambda: HttpResponse(
+                snapshots.get_menu_list(request.user.id),
+                content_type='application/json'
+            )
+        )
+
+    def get_conditional_state(self):
+        """Return the snapshot version, which changes with the menu tree."""
+        return snapshots.get_version(self.request.user.id), None
+
     def perform_create(self, serializer):
         """Save the post data when creating a new menu."""
         serializer.save(owner=self.request.user)
@@ -23,13 +76,30 @@ class ListCreateMenuView(generics.ListCreateAPIView):
 
 class MenuDetailsView(generics.RetrieveUpdateDestroyAPIView):
     """This class handles the http GET, PUT and DELETE requests."""
-    queryset = models.Menu.objects.all()
+    queryset = models.Menu.objects.with_tree()
     serializer_class = serializers.MenuSerializer
     permission_classes = (
         permissions.IsAuthenticated,
         IsOwner,
     )
 
+    def retrieve(self, request, *args, **kwargs):
+        """Serve the menu from its pre-rendered snapshot."""
+        content = None
+        if (isinstance(request.accepted_renderer, JSONRenderer) and
+                not serializers.get_sparse_fieldset(request)):
+            content = snapshots.get_menu(request.user.id, self.kwargs['pk'])
+        if content is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            request,
+            lambda: HttpResponse(content, content_type='application/json')
+        )
+
+    def get_conditional_state(self):
+        """Return the snapshot version, which changes with the menu tree."""
+        return snapshots.get_version(self.request.user.id), None
+
 
 class ListCreateMenuItemView(generics.ListCreateAPIView):
     """This class defines the create behavior of our rest api."""
@@ -49,6 +119,12 @@ class MenuItemDetailsView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
 
+class ReorderMenuItemView(generics.ReorderAPIView):
+    """This class rewrites the order of the menu items in one request."""
+    queryset = models.MenuItem.objects.all()
+    permission_classes = (permissions.IsAuthenticated,)
+
+
 class ListCreateSubMenuItemView(generics.ListCreateAPIView):
     """This class defines the create behavior of our rest api."""
     queryset = models.SubMenuItem.objects.all()
@@ -67,6 +143,12 @@ class SubMenuItemDetailsView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
 
+class ReorderSubMenuItemView(generics.ReorderAPIView):
+    """This class rewrites the order of the sub menu items in one request."""
+    queryset = models.SubMenuItem.objects.all()
+    permission_classes = (permissions.IsAuthenticated,)
+
+
 # Skill Views
 class ListCreateSkillChartView(generics.ListCreateAPIView):
     """This class defines the create behavior for the Skill Chart Model."""
@@ -109,6 +191,7 @@ class ListCreateSkillView(generics.ListCreateAPIView):
     queryset = models.Skill.objects.all()
     serializer_class = serializers.SkillSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    ordering = ('name',)
 
     def get_queryset(self):
         return models.Skill.objects.all().order_by('name')
@@ -125,9 +208,16 @@ class SkillDetailsView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
 
+class ReorderSkillView(generics.ReorderAPIView):
+    """This class rewrites the order of the skills in one request."""
+    queryset = models.Skill.objects.all()
+    permission_classes = (permissions.IsAuthenticated,)
+
+
 class SearchSkills(generics.ListAPIView):
     serializer_class = serializers.SkillSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    ordering = ('order', 'id')
 
     def get_queryset(self):
         url = self.kwargs['url']
@@ -140,6 +230,7 @@ class ListCreateExperienceView(generics.ListCreateAPIView):
     queryset = models.Experience.objects.all()
     serializer_class = serializers.ExperienceSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    ordering = ('order', 'id')
 
     def get_queryset(self):
         return models.Experience.objects.all().order_by('order')
@@ -156,6 +247,12 @@ class ExperienceDetailsView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
 
+class ReorderExperienceView(generics.ReorderAPIView):
+    """This class rewrites the order of the experiences in one request."""
+    queryset = models.Experience.objects.all()
+    permission_classes = (permissions.IsAuthenticated,)
+
+
 # Program Views
 class ListCreateProgramCategoryView(generics.ListCreateAPIView):
     """This class defines the create behavior for the Skill Chart Model."""
@@ -208,6 +305,7 @@ class ListCreateEducationView(generics.ListCreateAPIView):
     queryset = models.Education.objects.all()
     serializer_class = serializers.EducationSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    ordering = ('order', 'id')
 
     def perform_create(self, serializer):
         """Save the post data when creating a new skill chart."""
@@ -221,12 +319,19 @@ class EducationDetailsView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
 
+class ReorderEducationView(generics.ReorderAPIView):
+    """This class rewrites the order of the education entries at once."""
+    queryset = models.Education.objects.all()
+    permission_classes = (permissions.IsAuthenticated,)
+
+
 # Course views
 class ListCreateCourseView(generics.ListCreateAPIView):
     """This class defines the create behavior for the Skill Chart Model."""
     queryset = models.Course.objects.all()
     serializer_class = serializers.CourseSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    ordering = ('order', 'id')
 
     def perform_create(self, serializer):
         """Save the post data when creating a new skill chart."""
@@ -240,12 +345,19 @@ class CourseDetailsView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
 
+class ReorderCourseView(generics.ReorderAPIView):
+    """This class rewrites the order of the courses in one request."""
+    queryset = models.Course.objects.all()
+    permission_classes = (permissions.IsAuthenticated,)
+
+
 # Testimony views
 class ListCreateTestimonyView(generics.ListCreateAPIView):
     """This class defines the create behavior for the Skill Chart Model."""
     queryset = models.Testimony.objects.all()
     serializer_class = serializers.TestimonySerializer
     permission_classes = (permissions.IsAuthenticated,)
+    ordering = ('order', 'id')
 
     def perform_create(self, serializer):
         """Save the post data when creating a new skill chart."""
@@ -259,18 +371,45 @@ class TestimonyDetailsView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
 
+class ReorderTestimonyView(generics.ReorderAPIView):
+    """This class rewrites the order of the testimonies in one request."""
+    queryset = models.Testimony.objects.all()
+    permission_classes = (permissions.IsAuthenticated,)
+
+
 # Case Study views
 class ListCreateCaseStudyView(generics.ListCreateAPIView):
     """This class defines the create behavior for the Skill Chart Model."""
     queryset = models.CaseStudy.objects.all()
     serializer_class = serializers.CaseStudySerializer
     permission_classes = (permissions.IsAuthenticated,)
+    ordering = ('order', 'id')
+
+    def get_queryset(self):
+        return filter_by_tags(models.CaseStudy.objects.all(), self.request)
 
     def perform_create(self, serializer):
         """Save the post data when creating a new skill chart."""
         serializer.save(owner=self.request.user)
 
 
+class CaseStudyTagsView(generics.ListAPIView):
+    """This class lists the tags of the case studies with their counts.
+
+    The same ``?tag=`` filter as the case study list narrows the counts to
+    the matching case studies.
+    """
+    serializer_class = serializers.TagSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    ordering = ('-count', 'name')
+
+    def get_queryset(self):
+        return models.Tag.objects.with_counts(filter_by_tags(
+            filter_by_owner(models.CaseStudy.objects.all(), self.request.user),
+            self.request
+        ))
+
+
 class CaseStudyDetailsView(generics.RetrieveUpdateDestroyAPIView):
     """This class handles the http GET, PUT and DELETE requests."""
     queryset = models.CaseStudy.objects.all()
@@ -278,6 +417,12 @@ class CaseStudyDetailsView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
 
+class ReorderCaseStudyView(generics.ReorderAPIView):
+    """This class rewrites the order of the case studies in one request."""
+    queryset = models.CaseStudy.objects.all()
+    permission_classes = (permissions.IsAuthenticated,)
+
+
 # Resource Views
 class ListCreateResourceCategoryView(generics.ListCreateAPIView):
     """This class defines the create behavior for the Skill Chart Model."""
@@ -313,3 +458,144 @@ class ResourceDetailsView(generics.RetrieveUpdateDestroyAPIView):
     queryset = models.Resource.objects.all()
     serializer_class = serializers.ResourceSerializer
     permission_classes = (permissions.IsAuthenticated,)
+
+
+# Search Views
+class SearchView(ProfilingMixin, APIView):
+    """This class searches the skills, programs, resources and case studies.
+
+    ``?q=`` holds the search terms, ``?page=`` and ``?page_size=`` pick the
+    page of hits returned for every collection. Each collection costs one
+    query plus the prefetches of its serializer.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    collections = (
+        ('skills', models.Skill, serializers.SkillSerializer),
+        ('programs', models.Program, serializers.ProgramSerializer),
+        ('resources', models.Resource, serializers.ResourceSerializer),
+        ('case_studies', models.CaseStudy, serializers.CaseStudySerializer),
+    )
+    page_size = 10
+    max_page_size = 100
+
+    def get_number(self, request, name, default, maximum=None):
+        """Return a positive integer query parameter."""
+        try:
+            number = int(request.query_params[name])
+        except (KeyError, ValueError):
+            return default
+        if number < 1:
+            return default
+        return min(number, maximum) if maximum else number
+
+    def get(self, request, *args, **kwargs):
+        text = request.query_params.get('q', '').strip()
+        page = self.get_number(request, 'page', 1)
+        page_size = self.get_number(
+            request,
+            'page_size',
+            self.page_size,
+            self.max_page_size
+        )
+        start = (page - 1) * page_size
+
+        data, more = {}, False
+        context = {'request': request, 'view': self}
+        for name, model, serializer_class in self.collections:
+            rows = []
+            if text:
+                select, prefetch = get_eager_lookups(
+                    serializer_class(context=context)
+                )
+                queryset = filter_by_owner(model.objects.all(), request.user)
+                queryset = search.search(
+                    queryset.select_related(*select).prefetch_related(
+                        *prefetch
+                    ),
+                    text
+                )
+                rows = list(queryset[start:start + page_size + 1])
+                more = more or len(rows) > page_size
+            with profiling.phase('serialize'):
+                data[name] = serializer_class(
+                    rows[:page_size],
+                    many=True,
+                    context=context
+                ).data
+
+        data['next'] = None
+        if more:
+            data['next'] = replace_query_param(
+                request.build_absolute_uri(),
+                'page',
+                page + 1
+            )
+        return Response(data)
+
+
+# Resume Views
+class ResumeView(ProfilingMixin, APIView):
+    """This class returns every portfolio section in one JSON document.
+
+    ``?sections=skills,courses`` picks the sections to include, all of them
+    by default. Documents are cached until a row of the user changes. Other
+    query parameters do not reach the sections.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    sections = (
+        ('experiences', ListCreateExperienceView),
+        ('education', ListCreateEducationView),
+        ('courses', ListCreateCourseView),
+        ('skills', ListCreateSkillView),
+        ('testimonies', ListCreateTestimonyView),
+        ('case_studies', ListCreateCaseStudyView),
+        ('programs', ListCreateProgramView),
+        ('menus', ListCreateMenuView),
+    )
+
+    def get_sections(self, request):
+        """Return the requested sections, in the order they were asked for."""
+        available = dict(self.sections)
+        names = request.query_params.get('sections')
+        if not names:
+            return self.sections
+        names = [name.strip() for name in names.split(',') if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError({
+                'sections': ['Unknown sections: {}.'.format(
+                    ', '.join(unknown)
+                )],
+            })
+        return tuple((name, available[name]) for name in names)
+
+    def get(self, request, *args, **kwargs):
+        sections = self.get_sections(request)
+        version, content = resume.get_document(request, sections)
+        etag = quote_etag('{}-{}'.format(
+            version,
+            hashlib.md5(content).hexdigest()
+        ))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        return response
+
+
+def serve_metrics(request):
+    """Serve the request metrics of every worker in the Prometheus format.
+
+    The view runs no query, so it still answers while the database is
+    down. When METRICS_TOKEN is set it must be sent as a bearer token.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and not constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        'Bearer {}'.format(token)
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,19 @@
+"""
+ASGI config for jp project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with any ASGI server, e.g. ``uvicorn jp.asgi:application``.
+
+Django 2.1 has no ASGI support of its own, so the WSGI application runs in
+the thread pool of ``api.asgi.ASGIHandler``.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jp.settings')
+
+from api.asgi import ASGIHandler  # noqa: E402
+
+application = ASGIHandler(get_wsgi_application())
@@ -43,17 +43,76 @@ INSTALLED_APPS = [
     'corsheaders',
 ]
 
+# Sessions, CSRF, authentication and messages only run on the paths in
+# FULL_MIDDLEWARE_PATHS. The API routes authenticate with tokens or basic
+# auth and skip them.
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ProfilingMiddleware',
+    'api.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.CsrfViewMiddleware',
+    'api.middleware.AuthenticationMiddleware',
+    'api.middleware.MessageMiddleware',
+    'api.middleware.XFrameOptionsMiddleware',
+    'api.middleware.ReplicaStickinessMiddleware',
 ]
 
+FULL_MIDDLEWARE_PATHS = ('/admin/', '/auth/')
+
+# Requests are profiled when they carry an X-Profile header signed by
+# api.profiling.make_token() within PROFILING_TOKEN_MAX_AGE seconds, or at
+# random for a PROFILING_SAMPLE_RATE fraction of them. Profiled responses
+# get a Server-Timing header and a JSON line in the api.profiling log.
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+
+# Every worker process writes its request metrics to its own file in
+# METRICS_DIR, at most every METRICS_FLUSH_INTERVAL seconds, and /metrics/
+# sums them. The files of exited workers are merged into dead.json. The
+# directory must be local to the host. When METRICS_TOKEN is set, /metrics/
+# asks for it as a bearer token.
+METRICS_DIR = os.environ.get(
+    'METRICS_DIR',
+    os.path.join(BASE_DIR, '.metrics')
+)
+METRICS_FLUSH_INTERVAL = 1
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# SQL statements slower than SLOW_QUERY_THRESHOLD_MS, 0 turning the log off,
+# are kept in a ring buffer of SLOW_QUERY_LOG_SIZE records in the default
+# cache, see api.slowqueries. SLOW_QUERY_EXPLAIN adds EXPLAIN (ANALYZE,
+# BUFFERS) of slow SELECT statements on PostgreSQL, running them twice.
+# Only the number and types of the parameters are kept unless
+# SLOW_QUERY_LOG_PARAMS is set, since their values may be secrets.
+SLOW_QUERY_THRESHOLD_MS = float(
+    os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200)
+)
+SLOW_QUERY_LOG_SIZE = 100
+SLOW_QUERY_STACK_DEPTH = 10
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN') == '1'
+SLOW_QUERY_LOG_PARAMS = os.environ.get('SLOW_QUERY_LOG_PARAMS') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = 'jp.urls'
 
 TEMPLATES = [
@@ -74,21 +133,98 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'jp.wsgi.application'
 
+# Threads running Django under jp.asgi. The pooled database backend opens
+# as many connections per process by default, one per thread.
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 8))
+
 
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
+# Connections are kept open for DB_CONN_MAX_AGE seconds and pinged before
+# reuse at most every DB_HEALTH_CHECK_INTERVAL seconds. Threaded workers can
+# set DB_ENGINE=api.db.pooled with DB_CONN_MAX_AGE=0 to share a pool of
+# DB_POOL_SIZE connections, one per thread, between the threads instead. A
+# thread finding the pool empty waits DB_POOL_TIMEOUT seconds for one.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': os.environ.get(
+            'DB_ENGINE',
+            'django.db.backends.postgresql_psycopg2'
+        ),
         'NAME': 'api',
         'USER': 'jpc',
         'PASSWORD': 'Potasio13!',
         'HOST': 'localhost',
         'PORT': '',
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'HEALTH_CHECK_INTERVAL': int(
+            os.environ.get('DB_HEALTH_CHECK_INTERVAL', 10)
+        ),
+        'POOL_SIZE': int(os.environ.get('DB_POOL_SIZE', ASGI_THREADS)),
+        'POOL_TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+}
+
+# Reads go to the replicas listed in DB_REPLICA_HOSTS, which are skipped
+# once they lag more than REPLICA_MAX_LAG seconds. A client that wrote
+# reads from the primary for the next REPLICA_STICKY_SECONDS.
+DATABASE_REPLICAS = []
+for host in filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')):
+    alias = 'replica{}'.format(len(DATABASE_REPLICAS) + 1)
+    DATABASES[alias] = dict(
+        DATABASES['default'],
+        HOST=host.strip(),
+        TEST={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+REPLICA_MAX_LAG = 5
+REPLICA_LAG_CHECK_INTERVAL = 5
+REPLICA_STICKY_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+
+# The default cache holds the auth generations, the data and menu versions,
+# the menu snapshots, the resume documents, the replica stickiness keys and
+# the slow query log. It is shared by every worker, so an invalidation in
+# one worker is seen by all of them.
+#
+# The file based cache is meant for development and single host setups.
+# Once it holds MAX_ENTRIES files, a write drops 1/CULL_FREQUENCY of them
+# at random, the never expiring version keys included. A dropped version
+# comes back with a new value, which only costs misses, but MAX_ENTRIES is
+# sized so that this does not happen in normal use. Deployments should
+# point CACHE_BACKEND and CACHE_LOCATION at memcached or redis instead.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION',
+            os.path.join(BASE_DIR, '.cache')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 100000)),
+            'CULL_FREQUENCY': 10,
+        },
     }
 }
 
+# The tests run on a scratch cache and METRICS_DIR, see api.runner.
+TEST_RUNNER = 'api.runner.TestRunner'
+
+MENU_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+RESUME_TIMEOUT = 60 * 60 * 24
+
+# Text search configuration of the full-text search columns.
+SEARCH_CONFIG = 'english'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -115,11 +251,25 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
-    )
+        'api.authentication.CachedBasicAuthentication',
+        'api.authentication.CachedTokenAuthentication',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
 }
 
+# Token lookups are cached in each worker for TOKEN_CACHE_TTL seconds.
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL = 60
+
+# Verified basic auth credentials are cached for CREDENTIAL_CACHE_TTL seconds.
+CREDENTIAL_CACHE_SIZE = 1024
+CREDENTIAL_CACHE_TTL = 60
+
+# Each worker rereads the generations that revoke tokens and credentials
+# from the shared cache every AUTH_GENERATION_CACHE_TTL seconds, so a
+# revocation takes at most that long to reach the other workers.
+AUTH_GENERATION_CACHE_TTL = 5
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/2.1/topics/i18n/
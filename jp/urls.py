@@ -16,7 +16,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from api.admin import slow_queries
+
 urlpatterns = [
+    path(
+        'admin/slow-queries/',
+        admin.site.admin_view(slow_queries),
+        name='slow-queries'
+    ),
     path('admin/', admin.site.urls),
     path('', include('api.urls')),
 ]